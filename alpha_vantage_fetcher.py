@@ -2,15 +2,50 @@ import requests
 import os
 from dotenv import load_dotenv
 import pandas as pd
+import threading
 import time
 
 load_dotenv()
 API_KEY = os.getenv('ALPHA_VANTAGE_API_KEY')
 
+class RateLimiter:
+    """
+    Thread-safe token bucket for API quotas
+    
+    acquire() blocks until a request is allowed, so calls are spread out at
+    tokens_per_minute instead of bursting into the provider's rate limit.
+    """
+    
+    def __init__(self, tokens_per_minute=5, burst=1):
+        """
+        Args:
+            tokens_per_minute: Sustained request rate allowed by the plan
+            burst: Requests that may go out back-to-back after an idle spell
+        """
+        self.rate = tokens_per_minute / 60.0
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                time.sleep((1 - self._tokens) / self.rate)
+
+
 class AlphaVantageDataFetcher:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, rate_limiter=None):
         self.api_key = api_key or API_KEY
         self.base_url = "https://www.alphavantage.co/query"
+        self.rate_limiter = rate_limiter
         
         if not self.api_key:
             raise ValueError("API key not found! Set ALPHA_VANTAGE_API_KEY in .env file")
@@ -26,6 +61,8 @@ class AlphaVantageDataFetcher:
                 'apikey': self.api_key
             }
             
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
             response = requests.get(self.base_url, params=params)
             data = response.json()
             
@@ -70,6 +107,8 @@ class AlphaVantageDataFetcher:
                 'apikey': self.api_key
             }
             
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
             response = requests.get(self.base_url, params=params)
             data = response.json()
             
@@ -0,0 +1,35 @@
+"""
+Chart File Helpers for Forex Trading Bot
+Locates saved chart images without listing whole directories into memory
+"""
+
+import os
+
+
+def latest_chart(dirpath='charts', prefix='performance_dashboard_', suffix='.png'):
+    """
+    Find the most recent chart in a directory.
+
+    Chart filenames carry a sortable timestamp (e.g. performance_dashboard_
+    20251021_090900.png), so the newest one is the largest matching name.
+    The directory is streamed with os.scandir, keeping only the current best.
+
+    Args:
+        dirpath (str): Directory holding the charts (default: 'charts')
+        prefix (str): Filename prefix to match
+        suffix (str): Filename suffix to match
+
+    Returns:
+        str: Path to the newest matching chart, or None if there is none
+    """
+    best = None
+    try:
+        it = os.scandir(dirpath)
+    except FileNotFoundError:
+        return None
+    with it as entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith(prefix) and name.endswith(suffix) and (best is None or name > best):
+                best = name
+    return os.path.join(dirpath, best) if best else None
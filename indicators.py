@@ -0,0 +1,101 @@
+"""
+Technical Indicators for Forex Trading Bot
+Numba-compiled indicator kernels shared by the trading and backtest code
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional - the kernels then run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+    prange = range
+
+
+@njit(cache=True, fastmath=True)
+def wilder_averages(prices, period):
+    """
+    Wilder-smoothed average gain and loss over a price series
+
+    Seeds with the simple average of the first `period` deltas, then applies
+    Wilder's recurrence to every later delta.
+
+    Args:
+        prices: 1-D float array with at least period + 1 prices
+        period: RSI period (e.g. 14)
+
+    Returns:
+        tuple: (avg_gain, avg_loss)
+    """
+    gain = 0.0
+    loss = 0.0
+    for i in range(1, period + 1):
+        d = prices[i] - prices[i - 1]
+        if d > 0:
+            gain += d
+        else:
+            loss -= d
+    avg_gain = gain / period
+    avg_loss = loss / period
+
+    for i in range(period + 1, prices.size):
+        d = prices[i] - prices[i - 1]
+        avg_gain = (avg_gain * (period - 1) + max(d, 0.0)) / period
+        avg_loss = (avg_loss * (period - 1) + max(-d, 0.0)) / period
+
+    return avg_gain, avg_loss
+
+
+def rsi_from_averages(avg_gain, avg_loss):
+    """Convert smoothed average gain/loss into an RSI value (0-100)"""
+    if avg_loss == 0:
+        return 100
+    rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+
+@njit(cache=True)
+def _wilder_rma(values, period):
+    """Wilder's running average (alpha = 1/period), NaN until the first full period"""
+    out = np.empty(values.size, dtype=values.dtype)  # Accumulate in float64, store in the input dtype
+    out[:period - 1] = np.nan
+    avg = 0.0
+    for i in range(period):
+        avg += values[i]
+    avg /= period
+    out[period - 1] = avg
+    for i in range(period, values.size):
+        avg = (avg * (period - 1) + values[i]) / period
+        out[i] = avg
+    return out
+
+
+def rsi_wilder(closes, period=14):
+    """
+    Wilder RSI for every bar of a close series in one pass
+    
+    Args:
+        closes: 1-D array of close prices (float32 input stays float32)
+        period: RSI period (default: 14)
+    
+    Returns:
+        np.ndarray: RSI aligned with closes; rsi[i] uses closes up to and
+                    including i, and the first `period` entries are NaN
+    """
+    closes = np.asarray(closes)
+    if closes.dtype != np.float32:
+        closes = closes.astype(np.float64)
+    rsi = np.full(closes.size, np.nan, dtype=closes.dtype)
+    if closes.size <= period:
+        return rsi
+    deltas = np.diff(closes)
+    avg_up = _wilder_rma(np.where(deltas > 0, deltas, 0.0), period)
+    avg_down = _wilder_rma(np.where(deltas < 0, -deltas, 0.0), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_up / avg_down
+    # No losses in the window means RSI 100, same as rsi_from_averages
+    rsi[1:] = np.where(avg_down == 0, 100, 100 - 100 / (1 + rs))
+    return rsi
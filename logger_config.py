@@ -3,8 +3,11 @@ Logging Configuration for Forex Trading Bot
 Creates organized logs with timestamps, levels, and file storage
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 from datetime import datetime
 
 
@@ -73,6 +76,59 @@ def setup_logger(name='ForexBot', log_file=None, console_level=logging.INFO, fil
     return logger
 
 
+def setup_queue_logger(name='ForexBot', log_file='logs/bot.log', level=logging.INFO,
+                       max_bytes=10 << 20, backup_count=3):
+    """
+    Set up a non-blocking logger for hot loops.
+    
+    Records are handed to a QueueHandler; a background QueueListener does the
+    formatting and writes to the console and a rotating log file, so callers
+    never wait on stdout or disk.
+    
+    Args:
+        name (str): Logger name (default: 'ForexBot')
+        log_file (str): Path to the rotating log file (default: logs/bot.log)
+        level: Minimum level passed to the handlers (default: INFO)
+        max_bytes (int): Rotate the log file after this many bytes (default: 10 MB)
+        backup_count (int): Number of rotated files to keep (default: 3)
+    
+    Returns:
+        logging.Logger: Configured logger instance
+    """
+    logger = logging.getLogger(name)
+    if getattr(logger, '_queue_listener', None) is not None:
+        return logger  # Already wired up by an earlier instance
+    
+    log_dir = os.path.dirname(log_file)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+    
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter('%(message)s'))
+    
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count
+    )
+    file_handler.setFormatter(logging.Formatter(
+        '%(asctime)s | %(name)s | %(levelname)-8s | %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    ))
+    
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)  # Flush anything still queued on shutdown
+    
+    logger.setLevel(level)
+    logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    logger.propagate = False
+    logger._queue_listener = listener
+    
+    return logger
+
+
 def get_logger(name='ForexBot'):
     """
     Get an existing logger instance.
@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy import stats
+from indicators import rsi_wilder
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -14,18 +15,6 @@ class MonteCarloAnalyzer:
     def __init__(self, initial_capital=1000):
         self.initial_capital = initial_capital
         
-    def calculate_rsi(self, prices, period=14):
-        """Calculate RSI indicator"""
-        deltas = np.diff(prices)
-        seed = deltas[:period+1]
-        up = seed[seed >= 0].sum() / period
-        down = -seed[seed < 0].sum() / period
-        if down == 0:
-            return 100
-        rs = up / down
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
-    
     def run_backtest_for_trades(self, df, rsi_buy=25, rsi_sell=75):
         """
         Run backtest to generate trade P&Ls AND percentage returns
@@ -36,10 +25,12 @@ class MonteCarloAnalyzer:
         trades = []
         trade_returns_pct = []  # NEW: Track percentage returns
         
+        # Shared Wilder RSI, computed once; bar i sees the RSI up to the previous close
+        rsi_arr = rsi_wilder(df['close'].to_numpy(), 14)
+        
         for i in range(14, len(df)):
             current_price = df.iloc[i]['close']
-            prices = df.iloc[i-14:i]['close'].values
-            rsi = self.calculate_rsi(prices)
+            rsi = rsi_arr[i-1]
             
             # Exit logic
             if position == 'LONG':
@@ -166,6 +157,53 @@ class MonteCarloAnalyzer:
             'n_simulations': n_simulations
         }
     
+    def run_monte_carlo_vectorized(self, equity, ruin_threshold=0.5):
+        """
+        Monte Carlo statistics from a precomputed matrix of equity curves
+        
+        Same results as run_monte_carlo, computed with array operations
+        over all simulations at once instead of a Python loop per path.
+        
+        Parameters:
+        -----------
+        equity : (n_simulations, n_trades) array of capital after each trade,
+                 e.g. initial_capital * np.cumprod(1 + sampled_returns, axis=1)
+        ruin_threshold : capital multiplier below which = ruin (0.5 = 50% of capital)
+        """
+        n_simulations = equity.shape[0]
+        
+        print("\n" + "="*70)
+        print("🎲 MONTE CARLO SIMULATION (Vectorized, Percentage-Based with Compounding)")
+        print("="*70)
+        print(f"📊 Base Trades: {equity.shape[1]}")
+        print(f"🔄 Simulations: {n_simulations:,}")
+        print(f"💰 Starting Capital: ${self.initial_capital:,.2f}")
+        print(f"⚠️  Ruin Threshold: {ruin_threshold*100}% of capital")
+        print("="*70)
+        
+        ruin_capital = self.initial_capital * ruin_threshold
+        
+        # A path is ruined at the first trade that takes it to the threshold
+        below = equity <= ruin_capital
+        ruined = below.any(axis=1)
+        first_ruin = below.argmax(axis=1)
+        rows = np.arange(n_simulations)
+        final_capitals = np.where(ruined, equity[rows, first_ruin], equity[:, -1])
+        
+        # Running peak starts at the initial capital, like the per-path loop
+        peaks = np.maximum(np.maximum.accumulate(equity, axis=1), self.initial_capital)
+        max_drawdowns = ((peaks - equity) / peaks * 100).max(axis=1)
+        max_drawdowns[ruined] = 100  # Total loss
+        
+        print(f"✅ Simulations complete!\n")
+        
+        return {
+            'final_capitals': final_capitals,
+            'max_drawdowns': max_drawdowns,
+            'ruin_count': int(ruined.sum()),
+            'n_simulations': n_simulations
+        }
+    
     def analyze_results(self, mc_results):
         """
         Analyze Monte Carlo results and print statistics
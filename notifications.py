@@ -3,72 +3,39 @@ Notification System for Forex Trading Bot
 Sends email alerts for trades and daily summaries
 """
 
+import atexit
+import hashlib
+import queue
 import smtplib
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from email.mime.image import MIMEImage
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
 from datetime import datetime
 import os
 from pathlib import Path
 
+from trade_stats import summarize_pnl
 
-class TradingNotifier:
-    def __init__(self, sender_email, sender_password, recipient_email):
-        """
-        Initialize notification system
-        
-        Args:
-            sender_email: Gmail address to send from
-            sender_password: Gmail app password (NOT your regular password!)
-            recipient_email: Email address to receive alerts
-        """
-        self.sender_email = sender_email
-        self.sender_password = sender_password
-        self.recipient_email = recipient_email
-        
-    def send_email(self, subject, body, html_body=None, image_path=None):
-        """Send an email with optional HTML and image attachment"""
-        try:
-            msg = MIMEMultipart('alternative')
-            msg['From'] = self.sender_email
-            msg['To'] = self.recipient_email
-            msg['Subject'] = subject
-            
-            # Add plain text version
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # Add HTML version if provided
-            if html_body:
-                msg.attach(MIMEText(html_body, 'html'))
-            
-            # Attach image if provided
-            if image_path and os.path.exists(image_path):
-                with open(image_path, 'rb') as f:
-                    img = MIMEImage(f.read())
-                    img.add_header('Content-Disposition', 'attachment', 
-                                  filename=os.path.basename(image_path))
-                    msg.attach(img)
-            
-            # Connect to SMTP server (supports Gmail, ProtonMail, etc.)
-            # ProtonMail uses: smtp.protonmail.com or mail.protonmail.com
-            smtp_server = 'smtp.protonmail.com' if 'proton' in self.sender_email else 'smtp.gmail.com'
-            
-            with smtplib.SMTP_SSL(smtp_server, 465) as server:
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(msg)
-            
-            print(f"✅ Email sent: {subject}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Failed to send email: {e}")
-            return False
-    
-    def notify_trade_opened(self, pair, entry_price, position_size, rsi, capital):
-        """Send alert when a trade is opened"""
-        subject = f"🤖 TRADE OPENED - {pair}"
-        
-        body = f"""
+
+# Recycle the SMTP connection after this many messages so long sessions
+# don't run into provider-side per-connection limits
+MAX_MESSAGES_PER_CONNECTION = 100
+
+# Delivery attempts per email, with exponential backoff capped at MAX_RETRY_DELAY seconds
+SEND_ATTEMPTS = 5
+MAX_RETRY_DELAY = 30
+
+# Identity keys of recently sent emails remembered to avoid double-sending;
+# also written to DEDUPE_FILE so a restart after a crash doesn't resend
+DEDUPE_CACHE_SIZE = 256
+DEDUPE_FILE = 'logs/sent_emails.txt'
+
+# Message templates - parsed once at import, filled in with str.format per alert
+_TRADE_OPEN_TEXT = """
 🚀 NEW TRADE ALERT!
 
 Pair: {pair}
@@ -78,63 +45,25 @@ Position Size: ${position_size:.2f}
 RSI: {rsi:.1f}
 Current Capital: ${capital:.2f}
 
-Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Time: {now}
 
 Your forex bot is working! 📈
         """
-        
-        html_body = f"""
+
+_TRADE_OPEN_HTML = """
         <html>
         <body style="font-family: Arial, sans-serif; padding: 20px;">
             <h2 style="color: #2ecc71;">🚀 NEW TRADE OPENED!</h2>
-            <table style="border-collapse: collapse; width: 100%; max-width: 500px;">
-                <tr style="background-color: #f0f0f0;">
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>Pair</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">{pair}</td>
-                </tr>
-                <tr>
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>Action</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">LONG POSITION OPENED</td>
-                </tr>
-                <tr style="background-color: #f0f0f0;">
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>Entry Price</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">${entry_price:.5f}</td>
-                </tr>
-                <tr>
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>Position Size</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">${position_size:.2f}</td>
-                </tr>
-                <tr style="background-color: #f0f0f0;">
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>RSI</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">{rsi:.1f}</td>
-                </tr>
-                <tr>
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>Current Capital</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">${capital:.2f}</td>
-                </tr>
-            </table>
+            <table style="border-collapse: collapse; width: 100%; max-width: 500px;">{rows}</table>
             <p style="margin-top: 20px; color: #666;">
-                Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+                Time: {now}
             </p>
             <p style="color: #2ecc71; font-weight: bold;">Your forex bot is working! 📈</p>
         </body>
         </html>
         """
-        
-        return self.send_email(subject, body, html_body)
-    
-    def notify_trade_closed(self, pair, entry_price, exit_price, pnl, pnl_pct, 
-                           duration_min, capital, reason="SESSION_END"):
-        """Send alert when a trade is closed"""
-        
-        # Determine if win or loss
-        is_win = pnl > 0
-        emoji = "✅" if is_win else "❌"
-        color = "#2ecc71" if is_win else "#e74c3c"
-        
-        subject = f"{emoji} TRADE CLOSED - {pair} ({'+' if is_win else ''}{pnl_pct:.2f}%)"
-        
-        body = f"""
+
+_TRADE_CLOSE_TEXT = """
 {emoji} TRADE CLOSED!
 
 Pair: {pair}
@@ -146,85 +75,30 @@ Duration: {duration_min:.1f} minutes
 Reason: {reason}
 
 New Capital: ${capital:.2f}
-Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Time: {now}
 
-{'Great trade! 🎉' if is_win else 'Small loss, keep going! 💪'}
+{message}
         """
-        
-        html_body = f"""
+
+_TRADE_CLOSE_HTML = """
         <html>
         <body style="font-family: Arial, sans-serif; padding: 20px;">
             <h2 style="color: {color};">{emoji} TRADE CLOSED!</h2>
-            <table style="border-collapse: collapse; width: 100%; max-width: 500px;">
-                <tr style="background-color: #f0f0f0;">
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>Pair</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">{pair}</td>
-                </tr>
-                <tr>
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>Entry Price</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">${entry_price:.5f}</td>
-                </tr>
-                <tr style="background-color: #f0f0f0;">
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>Exit Price</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">${exit_price:.5f}</td>
-                </tr>
-                <tr style="background-color: {color}20;">
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>P&L</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd; color: {color}; font-weight: bold;">
-                        ${pnl:+.2f} ({pnl_pct:+.2f}%)
-                    </td>
-                </tr>
-                <tr>
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>Duration</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">{duration_min:.1f} minutes</td>
-                </tr>
-                <tr style="background-color: #f0f0f0;">
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>Reason</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">{reason}</td>
-                </tr>
-                <tr>
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>New Capital</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">${capital:.2f}</td>
-                </tr>
-            </table>
+            <table style="border-collapse: collapse; width: 100%; max-width: 500px;">{rows}</table>
             <p style="margin-top: 20px; color: #666;">
-                Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+                Time: {now}
             </p>
             <p style="color: {color}; font-weight: bold;">
-                {'Great trade! 🎉' if is_win else 'Small loss, keep going! 💪'}
+                {message}
             </p>
         </body>
         </html>
         """
-        
-        return self.send_email(subject, body, html_body)
-    
-    def notify_daily_summary(self, trade_history, chart_path=None):
-        """Send end-of-day summary with statistics and chart"""
-        
-        if not trade_history:
-            return False
-        
-        # Calculate summary stats
-        total_trades = len(trade_history)
-        wins = [t for t in trade_history if t['pnl'] > 0]
-        losses = [t for t in trade_history if t['pnl'] < 0]
-        win_rate = (len(wins) / total_trades * 100) if total_trades > 0 else 0
-        
-        total_pnl = sum(t['pnl'] for t in trade_history)
-        start_capital = trade_history[0]['capital'] - trade_history[0]['pnl']
-        end_capital = trade_history[-1]['capital']
-        total_return_pct = ((end_capital - start_capital) / start_capital) * 100
-        
-        avg_win = sum(t['pnl'] for t in wins) / len(wins) if wins else 0
-        avg_loss = sum(t['pnl'] for t in losses) / len(losses) if losses else 0
-        
-        subject = f"📊 Daily Trading Summary - {datetime.now().strftime('%Y-%m-%d')}"
-        
-        body = f"""
+
+_SUMMARY_TEXT = """
 📊 DAILY TRADING SUMMARY
 
-Date: {datetime.now().strftime('%Y-%m-%d')}
+Date: {date}
 
 PERFORMANCE:
 Starting Capital: ${start_capital:.2f}
@@ -233,8 +107,8 @@ Total Return: ${total_pnl:+.2f} ({total_return_pct:+.2f}%)
 
 TRADE STATS:
 Total Trades: {total_trades}
-Wins: {len(wins)} ({win_rate:.1f}%)
-Losses: {len(losses)} ({100-win_rate:.1f}%)
+Wins: {wins} ({win_rate:.1f}%)
+Losses: {losses} ({loss_rate:.1f}%)
 Avg Win: ${avg_win:.2f}
 Avg Loss: ${avg_loss:.2f}
 
@@ -242,54 +116,18 @@ See attached chart for visual breakdown!
 
 Keep up the great work! 💪
         """
-        
-        html_body = f"""
+
+_SUMMARY_HTML = """
         <html>
         <body style="font-family: Arial, sans-serif; padding: 20px;">
             <h2 style="color: #3498db;">📊 DAILY TRADING SUMMARY</h2>
-            <p style="color: #666;">Date: {datetime.now().strftime('%Y-%m-%d')}</p>
+            <p style="color: #666;">Date: {date}</p>
             
             <h3 style="color: #2ecc71;">💰 PERFORMANCE</h3>
-            <table style="border-collapse: collapse; width: 100%; max-width: 500px; margin-bottom: 20px;">
-                <tr style="background-color: #f0f0f0;">
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>Starting Capital</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">${start_capital:.2f}</td>
-                </tr>
-                <tr>
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>Ending Capital</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">${end_capital:.2f}</td>
-                </tr>
-                <tr style="background-color: {'#2ecc7120' if total_pnl >= 0 else '#e74c3c20'};">
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>Total Return</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd; font-weight: bold; color: {'#2ecc71' if total_pnl >= 0 else '#e74c3c'};">
-                        ${total_pnl:+.2f} ({total_return_pct:+.2f}%)
-                    </td>
-                </tr>
-            </table>
+            <table style="border-collapse: collapse; width: 100%; max-width: 500px; margin-bottom: 20px;">{performance_rows}</table>
             
             <h3 style="color: #3498db;">📈 TRADE STATS</h3>
-            <table style="border-collapse: collapse; width: 100%; max-width: 500px;">
-                <tr style="background-color: #f0f0f0;">
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>Total Trades</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">{total_trades}</td>
-                </tr>
-                <tr>
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>Wins</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">{len(wins)} ({win_rate:.1f}%)</td>
-                </tr>
-                <tr style="background-color: #f0f0f0;">
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>Losses</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">{len(losses)} ({100-win_rate:.1f}%)</td>
-                </tr>
-                <tr>
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>Avg Win</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">${avg_win:.2f}</td>
-                </tr>
-                <tr style="background-color: #f0f0f0;">
-                    <td style="padding: 10px; border: 1px solid #ddd;"><strong>Avg Loss</strong></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">${avg_loss:.2f}</td>
-                </tr>
-            </table>
+            <table style="border-collapse: collapse; width: 100%; max-width: 500px;">{stats_rows}</table>
             
             <p style="margin-top: 20px; color: #2ecc71; font-weight: bold;">
                 Keep up the great work! 💪
@@ -301,8 +139,358 @@ Keep up the great work! 💪
         </body>
         </html>
         """
+
+# One table row of an alert email; every notification table is built from these
+_ROW = ('<tr{tr_style}><td style="padding: 10px; border: 1px solid #ddd;"><strong>{label}</strong></td>'
+        '<td style="padding: 10px; border: 1px solid #ddd;{td_style}">{value}</td></tr>')
+
+
+def _row(label, value, alt=False, color=None):
+    """Render one label/value table row (alt = shaded, color = highlighted value)"""
+    if color:
+        tr_style = f' style="background-color: {color}20;"'
+        td_style = f' color: {color}; font-weight: bold;'
+    else:
+        tr_style = ' style="background-color: #f0f0f0;"' if alt else ''
+        td_style = ''
+    return _ROW.format(tr_style=tr_style, label=label, value=value, td_style=td_style)
+
+
+class TradingNotifier:
+    def __init__(self, sender_email, sender_password, recipient_email, dedupe_file=DEDUPE_FILE):
+        """
+        Initialize notification system
+        
+        Args:
+            sender_email: Gmail address to send from
+            sender_password: Gmail app password (NOT your regular password!)
+            recipient_email: Email address to receive alerts
+            dedupe_file: Where keys of sent emails are kept across restarts
+                         (None = remember them in memory only)
+        """
+        self.sender_email = sender_email
+        self.sender_password = sender_password
+        self.recipient_email = recipient_email
+        
+        # Connect to SMTP server (supports Gmail, ProtonMail, etc.)
+        # ProtonMail uses: smtp.protonmail.com or mail.protonmail.com
+        self.smtp_server = 'smtp.protonmail.com' if 'proton' in sender_email else 'smtp.gmail.com'
+        
+        # One logged-in connection is reused across alerts (opened lazily)
+        self._smtp = None
+        self._messages_on_connection = 0
+        
+        # Emails are sent by a background worker so callers never block on SMTP
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._drain, daemon=True)
+        self._recent = OrderedDict()  # dedupe key -> None, oldest first
+        self._dedupe_file = Path(dedupe_file) if dedupe_file else None
+        self._load_recent()
+        
+        # Delivery metrics (only the worker thread updates these)
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self._worker.start()
+        atexit.register(self.close)
+    
+    def _get_server(self):
+        """Return a live, logged-in SMTP connection, reconnecting if needed"""
+        if self._smtp is not None:
+            if self._messages_on_connection >= MAX_MESSAGES_PER_CONNECTION:
+                self._disconnect()
+            else:
+                try:
+                    if self._smtp.noop()[0] != 250:
+                        self._disconnect()
+                except (smtplib.SMTPException, OSError):
+                    self._disconnect()
+        
+        if self._smtp is None:
+            self._smtp = smtplib.SMTP_SSL(self.smtp_server, 465)
+            self._smtp.login(self.sender_email, self.sender_password)
+            self._messages_on_connection = 0
+        
+        return self._smtp
+    
+    def _disconnect(self):
+        """Drop the cached SMTP connection, quitting politely if possible"""
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+        self._smtp = None
+        self._messages_on_connection = 0
+    
+    def _drain(self):
+        """Worker loop: send queued emails one by one over the shared connection"""
+        while True:
+            future, job = self._queue.get()
+            try:
+                future.set_result(self._send_email_sync(*job))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                self._queue.task_done()
+    
+    def flush(self, timeout=None):
+        """
+        Wait until all queued emails have been sent
+        
+        Args:
+            timeout: Max seconds to wait (None = wait forever)
+        
+        Returns:
+            bool: True if the queue drained, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+    
+    def close(self, timeout=30):
+        """Send any queued emails, then close the SMTP connection (called automatically at exit)"""
+        self.flush(timeout)
+        self._disconnect()
+    
+    @contextmanager
+    def session(self, timeout=60):
+        """
+        Send a batch of emails over one SMTP connection
+        
+        Everything queued inside the block goes out on the shared connection;
+        on exit the queue is drained and the connection closed.
+        
+        Args:
+            timeout: Max seconds to wait for the batch on exit
+        """
+        try:
+            yield self
+        finally:
+            self.close(timeout)
+    
+    def send_email(self, subject, body, html_body=None, image_path=None, dedupe_key=None):
+        """
+        Queue an email for background delivery and return immediately
+        
+        Args:
+            dedupe_key: What makes this email unique (e.g. the trade it reports);
+                        a second email with the same key is skipped. Defaults
+                        to the full content, so keep timestamps out of it.
+        
+        Returns:
+            Future: resolves to True once the email is sent (or skipped as a
+                    duplicate) and False if delivery failed. It is always truthy,
+                    so check future.result() (after flush() to avoid blocking)
+                    rather than the return value itself.
+        """
+        future = Future()
+        if dedupe_key is None:
+            dedupe_key = (subject, body, html_body, image_path)
+        self._queue.put((future, (subject, body, html_body, image_path,
+                                  self._content_key(*dedupe_key))))
+        return future
+        
+    def _send_email_sync(self, subject, body, html_body=None, image_path=None, key=None):
+        """Send an email with optional HTML and image attachment"""
+        if key is not None and key in self._recent:
+            print(f"↩️  Skipping duplicate email: {subject}")
+            return True
+        
+        try:
+            msg = MIMEMultipart('alternative')
+            msg['From'] = self.sender_email
+            msg['To'] = self.recipient_email
+            msg['Subject'] = subject
+            
+            # Add plain text version
+            msg.attach(MIMEText(body, 'plain'))
+            
+            # Add HTML version if provided
+            if html_body:
+                msg.attach(MIMEText(html_body, 'html'))
+            
+            # Attach image if provided
+            if image_path and os.path.exists(image_path):
+                from email.mime.image import MIMEImage  # Only needed for chart attachments
+                with open(image_path, 'rb') as f:
+                    img = MIMEImage(f.read())
+                    img.add_header('Content-Disposition', 'attachment', 
+                                  filename=os.path.basename(image_path))
+                    msg.attach(img)
+            
+            self._deliver(msg)
+            if key is not None:
+                self._remember(key)
+            self.sent += 1
+            
+            print(f"✅ Email sent: {subject}")
+            return True
+            
+        except Exception as e:
+            self.failed += 1
+            print(f"❌ Failed to send email: {e}")
+            return False
+    
+    @staticmethod
+    def _is_transient(error):
+        """Whether a send failure is worth retrying (dropped connection, 4xx, network error)"""
+        if isinstance(error, smtplib.SMTPServerDisconnected):
+            return True
+        if isinstance(error, smtplib.SMTPResponseException):
+            return 400 <= error.smtp_code < 500
+        # Refused sender/recipients, bad credentials etc. won't fix themselves
+        return not isinstance(error, smtplib.SMTPException)
+    
+    def _deliver(self, msg):
+        """Send a message, reconnecting and backing off on transient failures"""
+        for attempt in range(SEND_ATTEMPTS):
+            try:
+                self._get_server().send_message(msg)
+                self._messages_on_connection += 1
+                return
+            except OSError as e:  # smtplib.SMTPException is an OSError too
+                # Connection is suspect after any failure - start fresh next attempt
+                self._disconnect()
+                if attempt == SEND_ATTEMPTS - 1 or not self._is_transient(e):
+                    raise
+                self.retries += 1
+                time.sleep(min(MAX_RETRY_DELAY, 2 ** attempt))
+    
+    @staticmethod
+    def _content_key(*parts):
+        """Stable hash of an email's identity, used for de-duplication"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(repr(part).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _load_recent(self):
+        """Restore the keys of emails sent by earlier runs from the dedupe file"""
+        if self._dedupe_file is None or not self._dedupe_file.exists():
+            return
+        try:
+            keys = self._dedupe_file.read_text().split()
+        except OSError:
+            return
+        for key in keys[-DEDUPE_CACHE_SIZE:]:
+            self._recent[key] = None
+    
+    def _remember(self, key):
+        """Record a sent email's key, evicting the oldest beyond DEDUPE_CACHE_SIZE"""
+        self._recent[key] = None
+        if len(self._recent) > DEDUPE_CACHE_SIZE:
+            self._recent.popitem(last=False)
+        
+        if self._dedupe_file is None:
+            return
+        try:
+            self._dedupe_file.parent.mkdir(parents=True, exist_ok=True)
+            self._dedupe_file.write_text("".join(k + "\n" for k in self._recent))
+        except OSError as e:
+            print(f"⚠️  Could not save sent-email keys: {e}")
+    
+    def notify_trade_opened(self, pair, entry_price, position_size, rsi, capital):
+        """Send alert when a trade is opened (returns send_email's Future)"""
+        subject = f"🤖 TRADE OPENED - {pair}"
+        fields = dict(pair=pair, entry_price=entry_price, position_size=position_size,
+                      rsi=rsi, capital=capital,
+                      now=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        
+        body = _TRADE_OPEN_TEXT.format_map(fields)
+        rows = "".join([
+            _row("Pair", pair, alt=True),
+            _row("Action", "LONG POSITION OPENED"),
+            _row("Entry Price", f"${entry_price:.5f}", alt=True),
+            _row("Position Size", f"${position_size:.2f}"),
+            _row("RSI", f"{rsi:.1f}", alt=True),
+            _row("Current Capital", f"${capital:.2f}"),
+        ])
+        html_body = _TRADE_OPEN_HTML.format(rows=rows, now=fields['now'])
+        
+        return self.send_email(subject, body, html_body,
+                               dedupe_key=(subject, pair, entry_price, position_size))
+    
+    def notify_trade_closed(self, pair, entry_price, exit_price, pnl, pnl_pct, 
+                           duration_min, capital, reason="SESSION_END"):
+        """Send alert when a trade is closed (returns send_email's Future)"""
+        
+        # Determine if win or loss
+        is_win = pnl > 0
+        emoji = "✅" if is_win else "❌"
+        color = "#2ecc71" if is_win else "#e74c3c"
+        
+        subject = f"{emoji} TRADE CLOSED - {pair} ({'+' if is_win else ''}{pnl_pct:.2f}%)"
+        fields = dict(pair=pair, entry_price=entry_price, exit_price=exit_price,
+                      pnl=pnl, pnl_pct=pnl_pct, duration_min=duration_min,
+                      capital=capital, reason=reason, emoji=emoji, color=color,
+                      message='Great trade! 🎉' if is_win else 'Small loss, keep going! 💪',
+                      now=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        
+        body = _TRADE_CLOSE_TEXT.format_map(fields)
+        fields['rows'] = "".join([
+            _row("Pair", pair, alt=True),
+            _row("Entry Price", f"${entry_price:.5f}"),
+            _row("Exit Price", f"${exit_price:.5f}", alt=True),
+            _row("P&L", f"${pnl:+.2f} ({pnl_pct:+.2f}%)", color=color),
+            _row("Duration", f"{duration_min:.1f} minutes"),
+            _row("Reason", reason, alt=True),
+            _row("New Capital", f"${capital:.2f}"),
+        ])
+        html_body = _TRADE_CLOSE_HTML.format_map(fields)
+        
+        return self.send_email(subject, body, html_body,
+                               dedupe_key=(subject, pair, entry_price, exit_price, reason))
+    
+    def notify_daily_summary(self, trade_history, chart_path=None):
+        """
+        Send end-of-day summary with statistics and chart
+        
+        Returns send_email's Future, or False when there are no trades to report.
+        """
+        
+        if not trade_history:
+            return False
+        
+        # Calculate summary stats (one pass over the P&Ls)
+        stats = summarize_pnl((t['pnl'] for t in trade_history), len(trade_history))
+        
+        start_capital = trade_history[0]['capital'] - trade_history[0]['pnl']
+        end_capital = trade_history[-1]['capital']
+        total_return_pct = ((end_capital - start_capital) / start_capital) * 100
+        
+        date = datetime.now().strftime('%Y-%m-%d')
+        subject = f"📊 Daily Trading Summary - {date}"
+        fields = dict(date=date, start_capital=start_capital, end_capital=end_capital,
+                      total_pnl=stats.total, total_return_pct=total_return_pct,
+                      total_trades=stats.n, wins=stats.wins, losses=stats.losses,
+                      win_rate=stats.win_rate, loss_rate=100 - stats.win_rate,
+                      avg_win=stats.avg_win, avg_loss=stats.avg_loss)
+        
+        body = _SUMMARY_TEXT.format_map(fields)
+        performance_rows = "".join([
+            _row("Starting Capital", f"${start_capital:.2f}", alt=True),
+            _row("Ending Capital", f"${end_capital:.2f}"),
+            _row("Total Return", f"${stats.total:+.2f} ({total_return_pct:+.2f}%)",
+                 color='#2ecc71' if stats.total >= 0 else '#e74c3c'),
+        ])
+        stats_rows = "".join([
+            _row("Total Trades", stats.n, alt=True),
+            _row("Wins", f"{stats.wins} ({stats.win_rate:.1f}%)"),
+            _row("Losses", f"{stats.losses} ({100 - stats.win_rate:.1f}%)", alt=True),
+            _row("Avg Win", f"${stats.avg_win:.2f}"),
+            _row("Avg Loss", f"${stats.avg_loss:.2f}", alt=True),
+        ])
+        html_body = _SUMMARY_HTML.format(date=date, performance_rows=performance_rows,
+                                         stats_rows=stats_rows)
         
-        return self.send_email(subject, body, html_body, chart_path)
+        return self.send_email(subject, body, html_body, chart_path,
+                               dedupe_key=(subject, stats.n, end_capital))
 
 
 # Test/Example usage
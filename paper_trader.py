@@ -1,12 +1,31 @@
-import yfinance as yf
-import pandas as pd
+import requests
 import numpy as np
+import random
 import time
+import logging
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 from telegram_notifier import TelegramNotifier
 from telegram_config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+from indicators import wilder_averages, rsi_from_averages
+from trade_stats import summarize_pnl
+from logger_config import setup_queue_logger
+from chart_files import latest_chart
+
+logger = logging.getLogger("paper_trader")
+
+# Number of recent prices kept in the rolling price buffer
+PRICE_BUFFER_SIZE = 4096
+
+# Seconds to reuse fetched 1h bars before asking Yahoo again
+HISTORY_CACHE_TTL = 60
+
+# Random draws generated per batch for the price simulator
+SIM_RANDOM_BATCH = 4096
+
+# Yahoo chart endpoint used for the latest 1m close (skips DataFrame construction)
+YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
 
 class PaperTrader:
     def __init__(self, symbol="EURUSD=X", initial_capital=1000, 
@@ -23,12 +42,37 @@ class PaperTrader:
         self.simulation_volatility = simulation_volatility
         self.simulated_price = 1.16550
         self.simulated_trend = 0.00001
+        self._rng = np.random.default_rng()
+        self._refill_random()
         
         self.position = None
         self.entry_price = 0
         self.entry_time = None
         self.trades = []
-        self.price_history = []
+        
+        # Price history as a fixed-size ring buffer (bounded memory, no per-tick boxing)
+        self._prices = np.empty(PRICE_BUFFER_SIZE, dtype=np.float64)
+        self._timestamps = np.empty(PRICE_BUFFER_SIZE, dtype='datetime64[ns]')
+        self._head = 0
+        self._count = 0
+        # Price differences kept alongside, so RSI never has to re-diff the window
+        self._deltas = np.zeros(PRICE_BUFFER_SIZE, dtype=np.float64)
+        self._window_idx = {}  # n -> (offsets, reusable index array) for wrapped windows
+        
+        # One Ticker for the whole session so live fetches reuse its HTTP connection.
+        # yfinance (and the pandas stack behind it) is only imported on first live use.
+        self._yf = None
+        self._ticker = None
+        self._http = None if simulation_mode else requests.Session()
+        if self._http is not None:
+            self._http.headers["User-Agent"] = "Mozilla/5.0"  # Yahoo rejects the default UA
+        self._hist_cache = None  # (fetched_at, prices, bar_ids)
+        
+        # Wilder-smoothed averages carried between cycles so RSI updates in O(1):
+        # "base_*" run up to the second-to-last bar (base_bar), "avg_*" add the
+        # newest bar (bar) on top
+        self._rsi_state = {"base_gain": None, "base_loss": None, "base_bar": None,
+                           "avg_gain": None, "avg_loss": None, "bar": None}
         
         self.stop_loss_pct = 0.03
         self.profit_target_pct = 0.10
@@ -45,27 +89,111 @@ class PaperTrader:
             print(f"🎮 Simulation:       ON (Volatility: {simulation_volatility})")
         print("="*70 + "\n")
         
+        # Per-cycle status lines go through a queued logger (console + logs/paper_trader.log)
+        setup_queue_logger("paper_trader", log_file="logs/paper_trader.log")
+        
         # Initialize Telegram notifier
         self.notifier = TelegramNotifier(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
         print("📱 Telegram notifications: ENABLED\n")
     
+    def _append_price(self, price):
+        """Record a price (and the current time) in the ring buffer"""
+        i = self._head % PRICE_BUFFER_SIZE
+        if self._count:
+            self._deltas[i] = price - self._prices[(i - 1) % PRICE_BUFFER_SIZE]
+        self._prices[i] = price
+        self._timestamps[i] = np.datetime64(datetime.now())
+        self._head += 1
+        self._count = min(self._count + 1, PRICE_BUFFER_SIZE)
+    
+    def _ring_window(self, buf, n):
+        """Last n entries of a ring buffer, oldest first"""
+        end = self._head % PRICE_BUFFER_SIZE
+        start = end - n
+        if start >= 0:
+            return buf[start:end]  # Zero-copy view into the ring buffer
+        # Window wraps around the end of the buffer - gather through a reused index array
+        if n not in self._window_idx:
+            self._window_idx[n] = (np.arange(-n, 0), np.empty(n, dtype=np.intp))
+        offsets, idx = self._window_idx[n]
+        np.add(offsets, self._head, out=idx)
+        np.remainder(idx, PRICE_BUFFER_SIZE, out=idx)
+        return np.take(buf, idx)
+    
+    def _prices_view(self, n):
+        """Return the last n recorded prices, oldest first (None if not enough yet)"""
+        if self._count < n:
+            return None
+        return self._ring_window(self._prices, n)
+    
+    def _deltas_view(self, n):
+        """Return the last n price differences, oldest first (None if not enough yet)"""
+        if self._count < n + 1:
+            return None
+        return self._ring_window(self._deltas, n)
+    
+    def _history_deltas(self):
+        """Deltas matching fetch_historical_prices() when it reads the ring buffer, else None"""
+        return self._deltas_view(self.rsi_period) if self.simulation_mode else None
+    
+    def _ring_bar_ids(self):
+        """(previous, newest) bar ids of the ring buffer - its running append count"""
+        return (self._head - 1, self._head)
+    
+    def _history_bar_ids(self):
+        """(previous, newest) bar ids of the fetch_historical_prices() window, or None if unknown"""
+        if self.simulation_mode:
+            return self._ring_bar_ids()
+        return self._hist_cache[2] if self._hist_cache is not None else None
+    
+    def _refill_random(self):
+        """Pre-draw a batch of simulator randomness in a few vectorized calls"""
+        self._norm_buf = self._rng.normal(self.simulated_trend, self.simulation_volatility, SIM_RANDOM_BATCH)
+        self._spike_buf = self._rng.normal(0, self.simulation_volatility * 3, SIM_RANDOM_BATCH)
+        self._uni_buf = self._rng.random(SIM_RANDOM_BATCH)
+        self._cursor = 0
+    
     def generate_simulated_price(self):
-        change_pct = np.random.normal(self.simulated_trend, self.simulation_volatility)
+        if self._cursor == SIM_RANDOM_BATCH:
+            self._refill_random()
+        c = self._cursor
+        self._cursor += 1
+        
+        change_pct = self._norm_buf[c]
         self.simulated_price = self.simulated_price * (1 + change_pct)
         
-        if np.random.random() < 0.1:
-            spike = np.random.normal(0, self.simulation_volatility * 3)
+        if self._uni_buf[c] < 0.1:
+            spike = self._spike_buf[c]
             self.simulated_price = self.simulated_price * (1 + spike)
         
         return self.simulated_price
     
+    def generate_simulated_path(self, n):
+        """Generate n consecutive simulated prices in one vectorized pass"""
+        steps = 1 + self._rng.normal(self.simulated_trend, self.simulation_volatility, n)
+        spikes = self._rng.normal(0, self.simulation_volatility * 3, n)
+        steps *= np.where(self._rng.random(n) < 0.1, 1 + spikes, 1.0)
+        path = self.simulated_price * np.cumprod(steps)
+        self.simulated_price = path[-1]
+        return path
+    
+    def _get_ticker(self):
+        """Return the session's yfinance Ticker, importing yfinance on first use"""
+        if self._ticker is None:
+            self._yf = self._yf or __import__('yfinance')
+            self._ticker = self._yf.Ticker(self.symbol)
+        return self._ticker
+    
     def fetch_current_price(self):
         if self.simulation_mode:
             return self.generate_simulated_price()
         else:
             try:
-                ticker = yf.Ticker(self.symbol)
-                data = ticker.history(period="1d", interval="1m")
+                return self._fetch_chart_close()
+            except (requests.RequestException, ValueError, KeyError, IndexError, TypeError, StopIteration):
+                pass  # Unexpected response - fall back to yfinance below
+            try:
+                data = self._get_ticker().history(period="1d", interval="1m")
                 if len(data) > 0:
                     return data['Close'].iloc[-1]
                 return None
@@ -73,36 +201,103 @@ class PaperTrader:
                 print(f"⚠️  Error: {e}")
                 return None
     
+    def _fetch_chart_close(self):
+        """Latest non-null 1m close straight from Yahoo's chart JSON"""
+        resp = self._http.get(YAHOO_CHART_URL.format(symbol=self.symbol),
+                              params={"interval": "1m", "range": "1d"}, timeout=5)
+        resp.raise_for_status()
+        closes = resp.json()["chart"]["result"][0]["indicators"]["quote"][0]["close"]
+        return next(c for c in reversed(closes) if c is not None)
+    
     def fetch_historical_prices(self):
         if self.simulation_mode:
-            if len(self.price_history) >= self.rsi_period + 1:
-                recent_prices = [p['price'] for p in self.price_history[-(self.rsi_period + 1):]]
-                return np.array(recent_prices)
-            else:
-                return None
+            return self._prices_view(self.rsi_period + 1)
         else:
+            # 1h bars barely move between checks - reuse the last fetch for a while
+            if self._hist_cache is not None:
+                fetched_at, prices, _ = self._hist_cache
+                if time.monotonic() - fetched_at < HISTORY_CACHE_TTL:
+                    return prices
             try:
-                ticker = yf.Ticker(self.symbol)
-                data = ticker.history(period="5d", interval="1h")
+                data = self._get_ticker().history(period="5d", interval="1h")
                 if len(data) >= self.rsi_period + 1:
-                    return data['Close'].values
+                    prices = data['Close'].values
+                    # Bars are identified by their timestamps (epoch ns)
+                    stamps = data.index.asi8
+                    self._hist_cache = (time.monotonic(), prices, (stamps[-2], stamps[-1]))
+                    return prices
                 return None
             except Exception as e:
                 print(f"⚠️  Error: {e}")
                 return None
     
-    def calculate_rsi(self, prices):
+    @staticmethod
+    def _wilder_step(avg_gain, avg_loss, delta, n):
+        """Smooth one more price difference into Wilder's average gain/loss"""
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        return (avg_gain * (n - 1) + gain) / n, (avg_loss * (n - 1) + loss) / n
+    
+    def calculate_rsi(self, prices, deltas=None, bar_ids=None):
+        """
+        RSI of the price window, updated incrementally between cycles
+        
+        The carried state stops at the second-to-last bar, and the newest
+        bar's current delta is applied on top every call. A live newest bar
+        that is still forming (same id, new close) is therefore always
+        priced in, and never baked into the state.
+        
+        Args:
+            prices: Price window, oldest first
+            deltas: Optional precomputed price differences for the last
+                    rsi_period prices (skips re-differencing on a reseed)
+            bar_ids: Optional (previous, newest) ids of the window's last two
+                     bars; the O(1) update is only taken when the window is
+                     the same as last call's or moved on by exactly one bar
+        
+        Returns:
+            float: RSI (0-100), or None if the window is too short
+        """
         if len(prices) < self.rsi_period + 1:
             return None
-        deltas = np.diff(prices)
-        seed = deltas[-(self.rsi_period + 1):]
-        up = seed[seed >= 0].sum() / self.rsi_period
-        down = -seed[seed < 0].sum() / self.rsi_period
-        if down == 0:
-            return 100
-        rs = up / down
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        n = self.rsi_period
+        state = self._rsi_state
+        newest = deltas[-1] if deltas is not None else prices[-1] - prices[-2]
+        base = None
+        
+        if bar_ids is not None and state["base_bar"] is not None and bar_ids[0] == state["base_bar"]:
+            # Same newest bar as last call (its close may have moved): reuse the base
+            base = state["base_gain"], state["base_loss"]
+        elif bar_ids is not None and state["bar"] is not None and bar_ids[0] == state["bar"]:
+            # Window moved forward by exactly one bar: the last call's newest bar
+            # is now complete, so fold its final delta into the base
+            if state["base_bar"] is not None:
+                prev = deltas[-2] if deltas is not None else prices[-2] - prices[-3]
+                base = self._wilder_step(state["base_gain"], state["base_loss"], prev, n)
+            else:
+                base = state["avg_gain"], state["avg_loss"]
+        elif len(prices) >= n + 2:
+            # Cold start (or the history jumped): rebuild the base from the whole window
+            base = wilder_averages(np.ascontiguousarray(prices[:-1], dtype=np.float64), n)
+        
+        if base is not None:
+            avg_gain, avg_loss = self._wilder_step(base[0], base[1], newest, n)
+        elif deltas is not None:
+            # Window is exactly one seed period: average the stored deltas directly
+            avg_gain = np.add.reduce(np.where(deltas > 0, deltas, 0.0)) / n
+            avg_loss = -np.add.reduce(np.where(deltas < 0, deltas, 0.0)) / n
+        else:
+            avg_gain, avg_loss = wilder_averages(np.ascontiguousarray(prices, dtype=np.float64), n)
+        
+        # A base is only kept when the bar ids say which bar it ends on
+        keep = bar_ids is not None
+        state["base_gain"], state["base_loss"] = base if base is not None and keep else (None, None)
+        state["base_bar"] = bar_ids[0] if base is not None and keep else None
+        state["avg_gain"] = avg_gain
+        state["avg_loss"] = avg_loss
+        state["bar"] = bar_ids[1] if keep else None
+        
+        return rsi_from_averages(avg_gain, avg_loss)
     
     def open_position(self, price):
         self.position = 'LONG'
@@ -172,30 +367,29 @@ class PaperTrader:
         if current_price is None:
             return False
         
-        self.price_history.append({
-            'timestamp': datetime.now(),
-            'price': current_price
-        })
+        self._append_price(current_price)
         
         historical_prices = self.fetch_historical_prices()
         if historical_prices is None:
             return False
         
-        rsi = self.calculate_rsi(historical_prices)
+        rsi = self.calculate_rsi(historical_prices, self._history_deltas(), self._history_bar_ids())
         if rsi is None:
             return False
         
-        now = datetime.now().strftime('%H:%M:%S')
-        pos = f"LONG @ ${self.entry_price:.5f}" if self.position else "FLAT"
-        
-        pnl_str = ""
-        if self.position == 'LONG':
-            unrealized_pnl_pct = (current_price - self.entry_price) / self.entry_price
-            unrealized_pnl_dollar = unrealized_pnl_pct * self.capital
-            pnl_color = "+" if unrealized_pnl_dollar >= 0 else ""
-            pnl_str = f" | P&L: {pnl_color}${unrealized_pnl_dollar:.2f}"
-        
-        print(f"[{now}] ${current_price:.5f} | RSI: {rsi:.1f} | {pos}{pnl_str} | Capital: ${self.capital:,.2f}")
+        if logger.isEnabledFor(logging.INFO):
+            now = datetime.now().strftime('%H:%M:%S')
+            pos = "LONG @ $%.5f" % self.entry_price if self.position else "FLAT"
+            
+            pnl_str = ""
+            if self.position == 'LONG':
+                unrealized_pnl_pct = (current_price - self.entry_price) / self.entry_price
+                unrealized_pnl_dollar = unrealized_pnl_pct * self.capital
+                pnl_color = "+" if unrealized_pnl_dollar >= 0 else ""
+                pnl_str = " | P&L: %s$%.2f" % (pnl_color, unrealized_pnl_dollar)
+            
+            logger.info("[%s] $%.5f | RSI: %.1f | %s%s | Capital: $%s",
+                        now, current_price, rsi, pos, pnl_str, f"{self.capital:,.2f}")
         
         if self.position == 'LONG':
             pnl_pct = (current_price - self.entry_price) / self.entry_price
@@ -212,33 +406,41 @@ class PaperTrader:
         
         return True
     
-    def run_paper_trading(self, duration_minutes=60, check_interval_seconds=5):
+    def run_paper_trading(self, duration_minutes=60, check_interval_seconds=5, jitter_seconds=0):
         interval_str = f"{check_interval_seconds} seconds" if check_interval_seconds < 60 else f"{check_interval_seconds/60:.0f} minutes"
         print(f"🚀 STARTING {duration_minutes} MINUTE SESSION")
         print(f"🔄 Checking every {interval_str}\n")
         
         if self.simulation_mode:
             print("🎮 Warming up simulation...")
-            for i in range(self.rsi_period + 5):
-                price = self.generate_simulated_price()
-                self.price_history.append({
-                    'timestamp': datetime.now(),
-                    'price': price
-                })
-            print(f"✅ Generated {len(self.price_history)} initial prices\n")
-        
-        start_time = time.time()
-        end_time = start_time + (duration_minutes * 60)
+            for price in self.generate_simulated_path(self.rsi_period + 5):
+                self._append_price(price)
+            print(f"✅ Generated {self._count} initial prices\n")
+        
+        # Monotonic deadlines: immune to clock changes, and slow cycles don't
+        # push every later cycle back
+        deadline = time.monotonic() + (duration_minutes * 60)
+        next_tick = time.monotonic()
         cycle = 0
         
         try:
-            while time.time() < end_time:
+            while time.monotonic() < deadline:
                 cycle += 1
+                next_tick += check_interval_seconds
                 print(f"\n--- Cycle {cycle} ---")
                 success = self.run_trading_cycle()
                 if not success:
                     print("⚠️  Cycle failed")
-                time.sleep(check_interval_seconds)
+                sleep_for = next_tick - time.monotonic()
+                if jitter_seconds:
+                    # Random offset so bots started together don't poll in lockstep;
+                    # next_tick is untouched, so the average cadence is unchanged
+                    sleep_for += random.uniform(0, jitter_seconds)
+                if sleep_for > 0:
+                    time.sleep(sleep_for)
+                elif sleep_for < -check_interval_seconds:
+                    # Fell more than a whole interval behind - resync instead of bursting
+                    next_tick = time.monotonic()
             
             if self.position == 'LONG':
                 price = self.fetch_current_price()
@@ -268,20 +470,17 @@ class PaperTrader:
         print(f"   Total Return:     ${total_return:+,.2f} ({total_return_pct:+.2f}%)")
         
         if self.trades:
-            wins = [t for t in self.trades if t['pnl_dollar'] > 0]
-            losses = [t for t in self.trades if t['pnl_dollar'] < 0]
+            stats = summarize_pnl((t['pnl_dollar'] for t in self.trades), len(self.trades))
             
             print(f"\n📈 TRADE STATS:")
-            print(f"   Total Trades:     {len(self.trades)}")
-            print(f"   Wins:             {len(wins)} ({len(wins)/len(self.trades)*100:.1f}%)")
-            print(f"   Losses:           {len(losses)} ({len(losses)/len(self.trades)*100:.1f}%)")
+            print(f"   Total Trades:     {stats.n}")
+            print(f"   Wins:             {stats.wins} ({stats.win_rate:.1f}%)")
+            print(f"   Losses:           {stats.losses} ({stats.losses/stats.n*100:.1f}%)")
             
-            if wins:
-                avg_win = np.mean([t['pnl_dollar'] for t in wins])
-                print(f"   Avg Win:          ${avg_win:.2f}")
-            if losses:
-                avg_loss = np.mean([t['pnl_dollar'] for t in losses])
-                print(f"   Avg Loss:         ${avg_loss:.2f}")
+            if stats.wins:
+                print(f"   Avg Win:          ${stats.avg_win:.2f}")
+            if stats.losses:
+                print(f"   Avg Loss:         ${stats.avg_loss:.2f}")
             
             print(f"\n📋 TRADE LOG:")
             for i, t in enumerate(self.trades, 1):
@@ -297,7 +496,6 @@ class PaperTrader:
         # Send Telegram daily summary
         if self.trades:
             try:
-                import glob
                 trade_history = []
                 for trade in self.trades:
                     trade_history.append({
@@ -311,8 +509,7 @@ class PaperTrader:
                         'capital': self.capital
                     })
                 
-                chart_files = glob.glob('charts/performance_dashboard_*.png')
-                latest_chart = max(chart_files) if chart_files else None
-                self.notifier.notify_daily_summary(trade_history, chart_path=latest_chart)
+                chart_path = latest_chart()
+                self.notifier.notify_daily_summary(trade_history, chart_path=chart_path)
             except Exception as e:
                 print(f"⚠️  Telegram summary failed: {e}")
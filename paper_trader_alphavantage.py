@@ -1,6 +1,5 @@
 from paper_trader import PaperTrader
 from alpha_vantage_fetcher import AlphaVantageDataFetcher
-import numpy as np
 from datetime import datetime
 
 class AlphaVantagePaperTrader(PaperTrader):
@@ -9,8 +8,8 @@ class AlphaVantagePaperTrader(PaperTrader):
     Builds RSI from collected prices over time (no intraday endpoint needed!)
     """
     
-    def __init__(self, from_currency="EUR", to_currency="USD", **kwargs):
-        self.av_fetcher = AlphaVantageDataFetcher()
+    def __init__(self, from_currency="EUR", to_currency="USD", rate_limiter=None, **kwargs):
+        self.av_fetcher = AlphaVantageDataFetcher(rate_limiter=rate_limiter)
         self.from_currency = from_currency
         self.to_currency = to_currency
         
@@ -43,15 +42,22 @@ class AlphaVantagePaperTrader(PaperTrader):
         if self.simulation_mode:
             return super().fetch_historical_prices()
         
-        # Use prices we've collected over time
-        if len(self.price_history) >= self.rsi_period + 1:
-            prices = [p['price'] for p in self.price_history[-(self.rsi_period + 1):]]
-            print(f"   📈 Using {len(prices)} collected prices for RSI")
-            return np.array(prices)
-        else:
+        # Use prices we've collected over time (read straight from the parent's ring buffer)
+        if self._count < self.rsi_period + 1:
             # Not enough history yet
-            print(f"   ⏳ Collecting prices... ({len(self.price_history)}/{self.rsi_period + 1} needed)")
+            print(f"   ⏳ Collecting prices... ({self._count}/{self.rsi_period + 1} needed)")
             return None
+        prices = self._prices_view(self.rsi_period + 1)
+        print(f"   📈 Using {len(prices)} collected prices for RSI")
+        return prices
+    
+    def _history_deltas(self):
+        """Collected prices always come from the ring buffer, so their deltas do too"""
+        return self._deltas_view(self.rsi_period)
+    
+    def _history_bar_ids(self):
+        """Collected prices always come from the ring buffer, so do their bar ids"""
+        return self._ring_bar_ids()
     
     def run_trading_cycle(self):
         """
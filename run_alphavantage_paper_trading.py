@@ -1,4 +1,10 @@
+import os
 from paper_trader_alphavantage import AlphaVantagePaperTrader
+from alpha_vantage_fetcher import RateLimiter
+
+# Requests per minute allowed by your Alpha Vantage plan (premium keys go much higher)
+rpm = float(os.getenv('ALPHA_VANTAGE_RPM', 1))
+check_interval = 60 / rpm
 
 print("🌐 ALPHA VANTAGE LIVE PAPER TRADING")
 print("Using professional real-time forex data!")
@@ -10,12 +16,13 @@ trader = AlphaVantagePaperTrader(
     initial_capital=1000,
     rsi_buy=25,
     rsi_sell=75,
-    simulation_mode=False
+    simulation_mode=False,
+    rate_limiter=RateLimiter(tokens_per_minute=rpm)
 )
 
 print("\n⚠️  IMPORTANT:")
 print("   - Real LIVE market data from Alpha Vantage")
-print("   - Checks every 60 seconds (API rate limit)")
+print(f"   - Checks every {check_interval:g} seconds (API rate limit: {rpm:g}/min)")
 print("   - Session runs for 30 minutes")
 print("   - Press Ctrl+C anytime to stop")
 print("\n" + "="*70 + "\n")
@@ -24,7 +31,7 @@ input("Press ENTER to start live trading with Alpha Vantage... ")
 
 trader.run_paper_trading(
     duration_minutes=30,
-    check_interval_seconds=60
+    check_interval_seconds=check_interval
 )
 
 print("\n✅ Alpha Vantage session complete!")
@@ -1,11 +1,72 @@
+import sys
 import pandas as pd
+import numpy as np
 from visualizer import PerformanceVisualizer
+from indicators import njit, rsi_wilder
+from data_loader import load_eurusd
 
 # Load the data
 print("📊 Loading EUR/USD data...")
-df = pd.read_csv('EUR_USD_1h.csv')
+df = load_eurusd()
 print(f"✅ Loaded {len(df)} data points")
 
+# Exit reason codes recorded by the compiled loop
+EXIT_NONE, EXIT_STOP_LOSS, EXIT_PROFIT_TARGET, EXIT_RSI = 0, 1, 2, 3
+
+
+@njit(cache=True)
+def _run_rsi_backtest(closes, rsi, start, rsi_buy, rsi_sell, stop_loss, profit_target, initial_capital):
+    """
+    Bar loop of the RSI strategy on plain arrays (compiled with numba when available)
+    
+    Returns:
+        tuple: (position, capital, trade_pnl, exit_code, entered) arrays for
+               bars start.., plus the final capital, position and entry price
+    """
+    n = closes.size - start
+    position_out = np.zeros(n, dtype=np.int8)
+    capital_out = np.empty(n)
+    pnl_out = np.zeros(n)
+    exit_out = np.zeros(n, dtype=np.int8)
+    entered_out = np.zeros(n, dtype=np.int8)
+    
+    capital = initial_capital
+    position = 0  # 0 = flat, 1 = long
+    entry_price = 0.0
+    
+    for i in range(start, closes.size):
+        k = i - start
+        current_price = closes[i]
+        
+        # Exit logic
+        if position == 1:
+            pnl_pct = (current_price - entry_price) / entry_price
+            code = EXIT_NONE
+            if pnl_pct <= -stop_loss:
+                code = EXIT_STOP_LOSS
+            elif pnl_pct >= profit_target:
+                code = EXIT_PROFIT_TARGET
+            elif rsi[i - 1] > rsi_sell:
+                code = EXIT_RSI
+            if code != EXIT_NONE:
+                trade_pnl = (current_price - entry_price) * (capital / entry_price)
+                capital += trade_pnl
+                pnl_out[k] = trade_pnl
+                exit_out[k] = code
+                position = 0
+        
+        # Entry logic
+        if position == 0 and rsi[i - 1] < rsi_buy:
+            position = 1
+            entry_price = current_price
+            entered_out[k] = 1
+        
+        position_out[k] = position
+        capital_out[k] = capital
+    
+    return position_out, capital_out, pnl_out, exit_out, entered_out, capital, position, entry_price
+
+
 # Simple RSI Strategy Backtest
 class SimpleBacktester:
     def __init__(self, initial_capital=1000):
@@ -14,99 +75,81 @@ class SimpleBacktester:
         self.position = None
         self.entry_price = 0
         self.results = []
+        self.trade_pnl = None
     
-    def calculate_rsi(self, prices, period=14):
-        """Calculate RSI"""
-        import numpy as np
-        deltas = np.diff(prices)
-        seed = deltas[:period+1]
-        up = seed[seed >= 0].sum() / period
-        down = -seed[seed < 0].sum() / period
-        if down == 0:
-            return 100
-        rs = up / down
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
-    
-    def run(self, df, rsi_buy=30, rsi_sell=70, stop_loss=0.03, profit_target=0.10):
+    def run(self, df, rsi_buy=30, rsi_sell=70, stop_loss=0.03, profit_target=0.10, verbose=False):
         print(f"\n🚀 Running backtest...")
         print(f"Strategy: RSI Buy<{rsi_buy}, Sell>{rsi_sell}")
         print(f"Risk: SL={stop_loss*100}%, PT={profit_target*100}%")
         print("=" * 60)
         
-        for i in range(14, len(df)):
-            current_price = df.iloc[i]['close']
-            prices = df.iloc[i-14:i]['close'].values
-            rsi = self.calculate_rsi(prices)
-            
-            trade_pnl = 0
-            
-            # Exit logic
-            if self.position == 'LONG':
-                pnl_pct = (current_price - self.entry_price) / self.entry_price
-                
-                if pnl_pct <= -stop_loss:
-                    trade_pnl = (current_price - self.entry_price) * (self.capital / self.entry_price)
-                    self.capital += trade_pnl
-                    print(f"🛑 Stop Loss | Trade: ${trade_pnl:.2f} | Capital: ${self.capital:.2f}")
-                    self.position = None
-                
-                elif pnl_pct >= profit_target:
-                    trade_pnl = (current_price - self.entry_price) * (self.capital / self.entry_price)
-                    self.capital += trade_pnl
-                    print(f"🎯 Profit Target | Trade: ${trade_pnl:.2f} | Capital: ${self.capital:.2f}")
-                    self.position = None
-                
-                elif rsi > rsi_sell:
-                    trade_pnl = (current_price - self.entry_price) * (self.capital / self.entry_price)
-                    self.capital += trade_pnl
-                    print(f"📈 RSI Exit | RSI={rsi:.1f} | Trade: ${trade_pnl:.2f} | Capital: ${self.capital:.2f}")
-                    self.position = None
-            
-            # Entry logic
-            if self.position is None and rsi < rsi_buy:
-                self.position = 'LONG'
-                self.entry_price = current_price
-                print(f"🔵 BUY | RSI={rsi:.1f} | Entry: ${current_price:.5f}")
-            
-            # Record state
-            self.results.append({
-                'timestamp': df.iloc[i]['timestamp'],
-                'close': current_price,
-                'rsi': rsi,
-                'position': self.position,
-                'capital': self.capital,
-                'trade_pnl': trade_pnl
-            })
+        # RSI for every bar in one Wilder-smoothed pass; bar i uses the RSI
+        # up to the previous close, so no look-ahead into the current bar
+        closes = df['close'].to_numpy()
+        timestamps = df['timestamp'].to_numpy()
+        rsi_arr = rsi_wilder(closes, 14)
+        
+        # The whole bar loop runs compiled; trade messages are printed afterwards
+        position, capital, pnl, exit_code, entered, self.capital, final_position, self.entry_price = \
+            _run_rsi_backtest(closes, rsi_arr, 14, rsi_buy, rsi_sell, stop_loss,
+                              profit_target, float(self.initial_capital))
+        self.position = 'LONG' if final_position else None
+        self.trade_pnl = pnl  # Per-bar realized P&L (0 where no trade closed)
+        
+        # Trade log is built in one pass and written with a single call
+        lines = []
+        if verbose:
+            for k in np.flatnonzero(exit_code | entered):
+                i = k + 14
+                rsi = rsi_arr[i-1]
+                if exit_code[k] == EXIT_STOP_LOSS:
+                    lines.append(f"🛑 Stop Loss | Trade: ${pnl[k]:.2f} | Capital: ${capital[k]:.2f}\n")
+                elif exit_code[k] == EXIT_PROFIT_TARGET:
+                    lines.append(f"🎯 Profit Target | Trade: ${pnl[k]:.2f} | Capital: ${capital[k]:.2f}\n")
+                elif exit_code[k] == EXIT_RSI:
+                    lines.append(f"📈 RSI Exit | RSI={rsi:.1f} | Trade: ${pnl[k]:.2f} | Capital: ${capital[k]:.2f}\n")
+                if entered[k]:
+                    lines.append(f"🔵 BUY | RSI={rsi:.1f} | Entry: ${closes[i]:.5f}\n")
         
         # Close final position
         if self.position == 'LONG':
-            final_price = df.iloc[-1]['close']
+            final_price = closes[-1]
             trade_pnl = (final_price - self.entry_price) * (self.capital / self.entry_price)
             self.capital += trade_pnl
-            print(f"🔚 Final Exit | Trade: ${trade_pnl:.2f} | Final: ${self.capital:.2f}")
+            if verbose:
+                lines.append(f"🔚 Final Exit | Trade: ${trade_pnl:.2f} | Final: ${self.capital:.2f}\n")
         
+        sys.stdout.write(''.join(lines))
         print("=" * 60)
-        return pd.DataFrame(self.results)
+        self.results = pd.DataFrame({
+            'timestamp': timestamps[14:],
+            'close': closes[14:],
+            'rsi': rsi_arr[13:-1],
+            'position': np.where(position == 1, 'LONG', None),
+            'capital': capital,
+            'trade_pnl': pnl
+        })
+        return self.results
 
 # Run the backtest
 bt = SimpleBacktester(initial_capital=1000)
-results_df = bt.run(df, rsi_buy=30, rsi_sell=70)
+results_df = bt.run(df, rsi_buy=30, rsi_sell=70, verbose=True)
 
 # Print summary
 total_return = bt.capital - bt.initial_capital
 total_return_pct = (total_return / bt.initial_capital) * 100
-trades = results_df[results_df['trade_pnl'] != 0]
-wins = (trades['trade_pnl'] > 0).sum()
-losses = (trades['trade_pnl'] < 0).sum()
-win_rate = (wins / len(trades) * 100) if len(trades) > 0 else 0
+# Trade counts straight from the P&L array - no DataFrame filtering needed
+n_trades = int(np.count_nonzero(bt.trade_pnl))
+wins = int((bt.trade_pnl > 0).sum())
+losses = int((bt.trade_pnl < 0).sum())
+win_rate = (wins / n_trades * 100) if n_trades > 0 else 0
 
 print("\n📊 RESULTS SUMMARY")
 print("=" * 60)
 print(f"Initial Capital:    ${bt.initial_capital:,.2f}")
 print(f"Final Capital:      ${bt.capital:,.2f}")
 print(f"Total Return:       ${total_return:,.2f} ({total_return_pct:+.2f}%)")
-print(f"Total Trades:       {len(trades)}")
+print(f"Total Trades:       {n_trades}")
 print(f"Wins/Losses:        {wins}/{losses}")
 print(f"Win Rate:           {win_rate:.1f}%")
 print("=" * 60)
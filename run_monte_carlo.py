@@ -1,8 +1,9 @@
-import pandas as pd
+import numpy as np
 from monte_carlo import MonteCarloAnalyzer
+from data_loader import load_eurusd
 
 print("🚀 Loading EUR/USD data...")
-df = pd.read_csv('EUR_USD_1h.csv')
+df = load_eurusd()
 print(f"✅ Loaded {len(df)} data points\n")
 
 # Create Monte Carlo analyzer
@@ -25,9 +26,14 @@ print(f"   Avg Loss:      {losses.mean()*100:+.2f}%")
 print(f"   Total P&L:     ${trades_dollar.sum():.2f}")
 
 # Run Monte Carlo simulation with PERCENTAGE returns (compounding!)
-mc_results = mc.run_monte_carlo(
-    trades_pct,           # Use percentage returns now!
-    n_simulations=10000,  # Run 10,000 simulations
+# All 10,000 shuffled trade sequences are built as one matrix up front
+rng = np.random.default_rng(42)
+n_simulations = 10000
+# Compounding stays in float64 even though prices load as float32
+sim_matrix = rng.permuted(np.tile(trades_pct.astype(np.float64), (n_simulations, 1)), axis=1)
+equity = mc.initial_capital * np.cumprod(1 + sim_matrix, axis=1)
+mc_results = mc.run_monte_carlo_vectorized(
+    equity,
     ruin_threshold=0.5    # Ruin = losing 50% of capital
 )
 
@@ -1,5 +1,12 @@
+import argparse
 from paper_trader import PaperTrader
 
+parser = argparse.ArgumentParser(description="Paper trade EUR/USD with live market data")
+parser.add_argument('--interval', type=int, default=60, help="Seconds between market checks")
+parser.add_argument('--duration', type=int, default=60, help="Session length in minutes")
+parser.add_argument('--jitter', type=float, default=5.0, help="Max random extra seconds per check")
+args = parser.parse_args()
+
 print("🚀 Welcome to Paper Trading!")
 print("\nThis will test your strategy with REAL current market data")
 print("using FAKE money (zero risk!)")
@@ -15,8 +22,8 @@ trader = PaperTrader(
 
 # Run paper trading session
 print("📌 INSTRUCTIONS:")
-print("   - Bot will check market every 60 seconds")
-print("   - Session runs for 60 minutes (1 hour)")
+print(f"   - Bot will check market every {args.interval} seconds")
+print(f"   - Session runs for {args.duration} minutes")
 print("   - Press Ctrl+C anytime to stop early")
 print("   - All trades are SIMULATED (no real money!)")
 print("\n" + "="*70 + "\n")
@@ -25,8 +32,9 @@ input("Press ENTER to start paper trading... ")
 
 # Start trading!
 trader.run_paper_trading(
-    duration_minutes=60,         # Run for 1 hour
-    check_interval_seconds=60    # Check every 60 seconds
+    duration_minutes=args.duration,         # Default: 1 hour
+    check_interval_seconds=args.interval,   # Default: every 60 seconds
+    jitter_seconds=args.jitter              # Spread out requests to yfinance
 )
 
 print("\n✅ Paper trading session complete!")
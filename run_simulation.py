@@ -1,5 +1,12 @@
+import argparse
 from paper_trader import PaperTrader
 
+parser = argparse.ArgumentParser(description="Paper trade against simulated EUR/USD prices")
+parser.add_argument('--interval', type=int, default=5, help="Seconds between price checks")
+parser.add_argument('--duration', type=int, default=10, help="Session length in minutes")
+parser.add_argument('--jitter', type=float, default=0.0, help="Max random extra seconds per check")
+args = parser.parse_args()
+
 print("🎮 SIMULATION MODE - Paper Trading with Fake Price Movement")
 print("\nThis simulates realistic EUR/USD price changes")
 print("so you can test your bot logic RIGHT NOW!")
@@ -17,18 +24,19 @@ trader = PaperTrader(
 
 print("📌 SIMULATION INFO:")
 print("   - Prices will move up/down realistically")
-print("   - Checks every 5 seconds (faster than live!)")
-print("   - Session runs for 10 minutes")
+print(f"   - Checks every {args.interval} seconds (faster than live!)")
+print(f"   - Session runs for {args.duration} minutes")
 print("   - You'll see trades happen in real-time!")
 print("   - Press Ctrl+C anytime to stop")
 print("\n" + "="*70 + "\n")
 
 input("Press ENTER to start simulation... ")
 
-# Run fast simulation (5 second intervals, 10 minute session)
+# Run fast simulation (default: 5 second intervals, 10 minute session)
 trader.run_paper_trading(
-    duration_minutes=10,        # 10 minute session
-    check_interval_seconds=5    # Check every 5 seconds!
+    duration_minutes=args.duration,
+    check_interval_seconds=args.interval,
+    jitter_seconds=args.jitter
 )
 
 print("\n✅ Simulation complete!")
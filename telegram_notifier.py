@@ -3,9 +3,132 @@ Telegram Notification System for Forex Trading Bot
 Sends instant alerts to your Telegram
 """
 
+import asyncio
+import os
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 
+from trade_stats import summarize_pnl
+
+try:
+    from requests_toolbelt import MultipartEncoder
+except ImportError:  # Optional - photos are then sent with requests' in-memory multipart body
+    MultipartEncoder = None
+
+
+# Message templates - parsed once at import, filled in with str.format per alert
+_TRADE_OPENED_TEXT = """
+🚀 <b>NEW TRADE OPENED!</b>
+
+<b>Pair:</b> {pair}
+<b>Action:</b> LONG POSITION
+<b>Entry Price:</b> ${entry_price:.5f}
+<b>Position Size:</b> ${position_size:.2f}
+<b>RSI:</b> {rsi:.1f}
+<b>Current Capital:</b> ${capital:.2f}
+
+⏰ {now}
+
+📈 Your forex bot is working!
+        """
+
+_TRADE_CLOSED_TEXT = """
+{emoji} <b>TRADE CLOSED!</b>
+
+<b>Pair:</b> {pair}
+<b>Entry:</b> ${entry_price:.5f}
+<b>Exit:</b> ${exit_price:.5f}
+
+{pnl_emoji} <b>P&L:</b> ${pnl:+.2f} ({pnl_pct:+.2f}%)
+<b>Duration:</b> {duration_min:.1f} minutes
+<b>Reason:</b> {reason}
+
+<b>New Capital:</b> ${capital:.2f}
+⏰ {now}
+
+{message}
+        """
+
+_DAILY_SUMMARY_TEXT = """
+📊 <b>DAILY TRADING SUMMARY</b>
+
+📅 {date}
+
+💰 <b>PERFORMANCE</b>
+<b>Starting Capital:</b> ${start_capital:.2f}
+<b>Ending Capital:</b> ${end_capital:.2f}
+<b>Total Return:</b> ${total_pnl:+.2f} ({total_return_pct:+.2f}%)
+
+📈 <b>TRADE STATS</b>
+<b>Total Trades:</b> {total_trades}
+<b>Wins:</b> {wins} ({win_rate:.1f}%)
+<b>Losses:</b> {losses} ({loss_rate:.1f}%)
+<b>Avg Win:</b> ${avg_win:.2f}
+<b>Avg Loss:</b> ${avg_loss:.2f}
+
+💪 Keep up the great work!
+        """
+
+
+def _trade_opened_text(pair, entry_price, position_size, rsi, capital):
+    """Message body for a newly opened trade"""
+    return _TRADE_OPENED_TEXT.format(
+        pair=pair, entry_price=entry_price, position_size=position_size,
+        rsi=rsi, capital=capital,
+        now=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    )
+
+
+def _trade_closed_text(pair, entry_price, exit_price, pnl, pnl_pct,
+                       duration_min, capital, reason):
+    """Message body for a closed trade"""
+    
+    # Determine if win or loss
+    is_win = pnl > 0
+    
+    return _TRADE_CLOSED_TEXT.format(
+        emoji="✅" if is_win else "❌",
+        pnl_emoji='🎉' if is_win else '📉',
+        message='Great trade! 🎉' if is_win else 'Small loss, keep going! 💪',
+        pair=pair, entry_price=entry_price, exit_price=exit_price,
+        pnl=pnl, pnl_pct=pnl_pct, duration_min=duration_min,
+        reason=reason, capital=capital,
+        now=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    )
+
+
+def _daily_summary_text(trade_history):
+    """Message body for the end-of-day summary"""
+    
+    # Calculate summary stats (one NumPy pass over the P&Ls)
+    stats = summarize_pnl((t['pnl'] for t in trade_history), len(trade_history))
+    
+    start_capital = trade_history[0]['capital'] - trade_history[0]['pnl']
+    end_capital = trade_history[-1]['capital']
+    total_return_pct = ((end_capital - start_capital) / start_capital) * 100
+    
+    return _DAILY_SUMMARY_TEXT.format(
+        date=datetime.now().strftime('%Y-%m-%d'),
+        start_capital=start_capital, end_capital=end_capital,
+        total_pnl=stats.total, total_return_pct=total_return_pct,
+        total_trades=stats.n, wins=stats.wins, losses=stats.losses,
+        win_rate=stats.win_rate, loss_rate=100 - stats.win_rate,
+        avg_win=stats.avg_win, avg_loss=stats.avg_loss,
+    )
+
+
+def _retry_after(response):
+    """Seconds Telegram asks us to back off for on a 429 response, else None"""
+    if response.status_code != 429:
+        return None
+    try:
+        return response.json().get('parameters', {}).get('retry_after')
+    except ValueError:
+        return None
+
 
 class TelegramNotifier:
     def __init__(self, bot_token, chat_id):
@@ -20,6 +143,33 @@ class TelegramNotifier:
         self.chat_id = chat_id
         self.base_url = f"https://api.telegram.org/bot{bot_token}"
         
+        # One pooled session so alerts reuse the TLS connection to api.telegram.org
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(
+            pool_connections=4, pool_maxsize=8,
+            max_retries=Retry(total=2, backoff_factor=0.3)
+        ))
+        # Text messages can be replayed safely, so they also retry on 429/5xx
+        # (honouring Retry-After). Photo bodies are streamed and can't be
+        # replayed by urllib3, so sendPhoto keeps the connect-only policy above.
+        self._session.mount(f"{self.base_url}/sendMessage", HTTPAdapter(
+            pool_connections=1, pool_maxsize=8,
+            max_retries=Retry(total=4, backoff_factor=0.5,
+                              status_forcelist=[429, 500, 502, 503, 504],
+                              allowed_methods=['POST'],
+                              respect_retry_after_header=True,
+                              raise_on_status=False)
+        ))
+    
+    def close(self):
+        """Close the pooled HTTP connections"""
+        session = getattr(self, '_session', None)
+        if session is not None:
+            session.close()
+    
+    def __del__(self):
+        self.close()
+        
     def send_message(self, text, parse_mode='HTML'):
         """Send a message to Telegram"""
         try:
@@ -29,7 +179,12 @@ class TelegramNotifier:
                 'text': text,
                 'parse_mode': parse_mode
             }
-            response = requests.post(url, json=payload, timeout=10)
+            response = self._session.post(url, json=payload, timeout=10)
+            wait = _retry_after(response)
+            if wait:
+                # Still rate limited after the adapter's retries - wait as told, try once more
+                time.sleep(wait)
+                response = self._session.post(url, json=payload, timeout=10)
             
             if response.status_code == 200:
                 print(f"✅ Telegram message sent!")
@@ -46,14 +201,31 @@ class TelegramNotifier:
         """Send a photo to Telegram"""
         try:
             url = f"{self.base_url}/sendPhoto"
-            with open(photo_path, 'rb') as photo:
-                files = {'photo': photo}
-                data = {
-                    'chat_id': self.chat_id,
-                    'caption': caption,
-                    'parse_mode': 'HTML'
-                }
-                response = requests.post(url, files=files, data=data, timeout=30)
+            data = {
+                'chat_id': str(self.chat_id),
+                'caption': caption,
+                'parse_mode': 'HTML'
+            }
+            for attempt in range(2):
+                photo = open(photo_path, 'rb', buffering=65536)
+                try:
+                    if MultipartEncoder is not None:
+                        # Stream the chart from disk instead of building the whole body in memory
+                        enc = MultipartEncoder(fields={
+                            **data,
+                            'photo': (os.path.basename(photo_path), photo, 'image/png')
+                        })
+                        response = self._session.post(url, data=enc, timeout=30,
+                                                      headers={'Content-Type': enc.content_type})
+                    else:
+                        response = self._session.post(url, files={'photo': photo}, data=data, timeout=30)
+                finally:
+                    photo.close()
+                
+                wait = _retry_after(response)
+                if not wait or attempt:
+                    break
+                time.sleep(wait)  # Rate limited - reopen the file and upload again
             
             if response.status_code == 200:
                 print(f"✅ Telegram photo sent!")
@@ -68,46 +240,14 @@ class TelegramNotifier:
     
     def notify_trade_opened(self, pair, entry_price, position_size, rsi, capital):
         """Send alert when a trade is opened"""
-        text = f"""
-🚀 <b>NEW TRADE OPENED!</b>
-
-<b>Pair:</b> {pair}
-<b>Action:</b> LONG POSITION
-<b>Entry Price:</b> ${entry_price:.5f}
-<b>Position Size:</b> ${position_size:.2f}
-<b>RSI:</b> {rsi:.1f}
-<b>Current Capital:</b> ${capital:.2f}
-
-⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-📈 Your forex bot is working!
-        """
+        text = _trade_opened_text(pair, entry_price, position_size, rsi, capital)
         return self.send_message(text)
     
     def notify_trade_closed(self, pair, entry_price, exit_price, pnl, pnl_pct, 
                            duration_min, capital, reason="SESSION_END"):
         """Send alert when a trade is closed"""
-        
-        # Determine if win or loss
-        is_win = pnl > 0
-        emoji = "✅" if is_win else "❌"
-        
-        text = f"""
-{emoji} <b>TRADE CLOSED!</b>
-
-<b>Pair:</b> {pair}
-<b>Entry:</b> ${entry_price:.5f}
-<b>Exit:</b> ${exit_price:.5f}
-
-{'🎉' if is_win else '📉'} <b>P&L:</b> ${pnl:+.2f} ({pnl_pct:+.2f}%)
-<b>Duration:</b> {duration_min:.1f} minutes
-<b>Reason:</b> {reason}
-
-<b>New Capital:</b> ${capital:.2f}
-⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-{'Great trade! 🎉' if is_win else 'Small loss, keep going! 💪'}
-        """
+        text = _trade_closed_text(pair, entry_price, exit_price, pnl, pnl_pct,
+                                  duration_min, capital, reason)
         return self.send_message(text)
     
     def notify_daily_summary(self, trade_history, chart_path=None):
@@ -116,46 +256,121 @@ class TelegramNotifier:
         if not trade_history:
             return False
         
-        # Calculate summary stats
-        total_trades = len(trade_history)
-        wins = [t for t in trade_history if t['pnl'] > 0]
-        losses = [t for t in trade_history if t['pnl'] < 0]
-        win_rate = (len(wins) / total_trades * 100) if total_trades > 0 else 0
+        text = _daily_summary_text(trade_history)
         
-        total_pnl = sum(t['pnl'] for t in trade_history)
-        start_capital = trade_history[0]['capital'] - trade_history[0]['pnl']
-        end_capital = trade_history[-1]['capital']
-        total_return_pct = ((end_capital - start_capital) / start_capital) * 100
+        # Send text summary
+        self.send_message(text)
         
-        avg_win = sum(t['pnl'] for t in wins) / len(wins) if wins else 0
-        avg_loss = sum(t['pnl'] for t in losses) / len(losses) if losses else 0
+        # Send chart if available
+        if chart_path:
+            self.send_photo(chart_path, caption="📊 Performance Dashboard")
         
-        text = f"""
-📊 <b>DAILY TRADING SUMMARY</b>
-
-📅 {datetime.now().strftime('%Y-%m-%d')}
-
-💰 <b>PERFORMANCE</b>
-<b>Starting Capital:</b> ${start_capital:.2f}
-<b>Ending Capital:</b> ${end_capital:.2f}
-<b>Total Return:</b> ${total_pnl:+.2f} ({total_return_pct:+.2f}%)
+        return True
 
-📈 <b>TRADE STATS</b>
-<b>Total Trades:</b> {total_trades}
-<b>Wins:</b> {len(wins)} ({win_rate:.1f}%)
-<b>Losses:</b> {len(losses)} ({100-win_rate:.1f}%)
-<b>Avg Win:</b> ${avg_win:.2f}
-<b>Avg Loss:</b> ${avg_loss:.2f}
 
-💪 Keep up the great work!
+class AsyncTelegramNotifier:
+    """
+    asyncio flavour of TelegramNotifier built on httpx.AsyncClient
+    
+    Same messages as TelegramNotifier, but sends are awaitable so several
+    of them (e.g. the daily summary text and chart) go out concurrently.
+    """
+    
+    def __init__(self, bot_token, chat_id):
         """
+        Initialize async Telegram notifier
         
-        # Send text summary
-        self.send_message(text)
+        Args:
+            bot_token: Bot token from BotFather
+            chat_id: Your Telegram chat ID
+        """
+        import httpx  # Only needed by the async notifier
         
-        # Send chart if available
+        self.bot_token = bot_token
+        self.chat_id = chat_id
+        self.base_url = f"https://api.telegram.org/bot{bot_token}"
+        self._client = httpx.AsyncClient(timeout=10.0)
+    
+    async def aclose(self):
+        """Close the underlying HTTP client"""
+        await self._client.aclose()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def send_message(self, text, parse_mode='HTML'):
+        """Send a message to Telegram"""
+        try:
+            url = f"{self.base_url}/sendMessage"
+            payload = {
+                'chat_id': self.chat_id,
+                'text': text,
+                'parse_mode': parse_mode
+            }
+            response = await self._client.post(url, json=payload)
+            
+            if response.status_code == 200:
+                print(f"✅ Telegram message sent!")
+                return True
+            else:
+                print(f"❌ Telegram failed: {response.text}")
+                return False
+                
+        except Exception as e:
+            print(f"❌ Telegram error: {e}")
+            return False
+    
+    async def send_photo(self, photo_path, caption=''):
+        """Send a photo to Telegram"""
+        try:
+            url = f"{self.base_url}/sendPhoto"
+            with open(photo_path, 'rb') as photo:
+                files = {'photo': photo}
+                data = {
+                    'chat_id': self.chat_id,
+                    'caption': caption,
+                    'parse_mode': 'HTML'
+                }
+                response = await self._client.post(url, files=files, data=data, timeout=30.0)
+            
+            if response.status_code == 200:
+                print(f"✅ Telegram photo sent!")
+                return True
+            else:
+                print(f"❌ Photo failed: {response.text}")
+                return False
+                
+        except Exception as e:
+            print(f"❌ Photo error: {e}")
+            return False
+    
+    async def notify_trade_opened(self, pair, entry_price, position_size, rsi, capital):
+        """Send alert when a trade is opened"""
+        text = _trade_opened_text(pair, entry_price, position_size, rsi, capital)
+        return await self.send_message(text)
+    
+    async def notify_trade_closed(self, pair, entry_price, exit_price, pnl, pnl_pct,
+                                  duration_min, capital, reason="SESSION_END"):
+        """Send alert when a trade is closed"""
+        text = _trade_closed_text(pair, entry_price, exit_price, pnl, pnl_pct,
+                                  duration_min, capital, reason)
+        return await self.send_message(text)
+    
+    async def notify_daily_summary(self, trade_history, chart_path=None):
+        """Send end-of-day summary, posting the text and chart concurrently"""
+        
+        if not trade_history:
+            return False
+        
+        text = _daily_summary_text(trade_history)
+        
+        sends = [self.send_message(text)]
         if chart_path:
-            self.send_photo(chart_path, caption="📊 Performance Dashboard")
+            sends.append(self.send_photo(chart_path, caption="📊 Performance Dashboard"))
+        await asyncio.gather(*sends)
         
         return True
 
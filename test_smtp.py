@@ -1,4 +1,5 @@
 import smtplib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from email_config import SENDER_EMAIL, SENDER_PASSWORD
 
 print("🔍 Testing ProtonMail SMTP Connection...\n")
@@ -12,14 +13,27 @@ servers = [
     ('127.0.0.1', 1025)  # ProtonMail Bridge if installed
 ]
 
-for server, port in servers:
+def _probe(server, port):
+    """Try to log in to one SMTP server; returns True on success"""
     try:
-        print(f"\n🔌 Trying {server}:{port}...")
         with smtplib.SMTP_SSL(server, port, timeout=10) as smtp:
             smtp.login(SENDER_EMAIL, SENDER_PASSWORD)
             print(f"✅ SUCCESS! {server}:{port} works!")
-            break
+            return True
     except Exception as e:
-        print(f"❌ Failed: {e}")
+        print(f"❌ Failed {server}:{port}: {e}")
+        return False
+
+# Probe all servers at once - wall time is the slowest probe, not the sum
+for server, port in servers:
+    print(f"\n🔌 Trying {server}:{port}...")
+
+with ThreadPoolExecutor(max_workers=4) as ex:
+    futures = {ex.submit(_probe, s, p): (s, p) for s, p in servers}
+    for fut in as_completed(futures):
+        if fut.result():
+            for other in futures:
+                other.cancel()
+            break
 
 print("\n" + "=" * 60)
@@ -0,0 +1,36 @@
+"""
+Trade Statistics for Forex Trading Bot
+Computes win/loss summary stats in a single NumPy pass over trade P&Ls
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+
+def summarize_pnl(pnls, count=-1):
+    """
+    Summarize a sequence of per-trade P&L values
+    
+    Args:
+        pnls: Iterable of P&L values (dollars)
+        count: Number of values, if known (lets NumPy allocate once)
+    
+    Returns:
+        SimpleNamespace with n, wins, losses, total, avg_win, avg_loss, win_rate
+    """
+    pnl = np.fromiter(pnls, dtype=np.float64, count=count)
+    win_mask = pnl > 0
+    loss_mask = pnl < 0
+    wins = int(win_mask.sum())
+    losses = int(loss_mask.sum())
+    
+    return SimpleNamespace(
+        n=pnl.size,
+        wins=wins,
+        losses=losses,
+        total=float(pnl.sum()),
+        avg_win=float(pnl[win_mask].mean()) if wins else 0.0,
+        avg_loss=float(pnl[loss_mask].mean()) if losses else 0.0,
+        win_rate=(wins / pnl.size * 100) if pnl.size else 0.0,
+    )
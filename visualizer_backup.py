@@ -3,15 +3,51 @@ Performance Visualizer for Forex Trading Bot
 Creates beautiful charts showing backtest results
 """
 
+import os
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from matplotlib.collections import PathCollection
+from matplotlib.colors import to_rgba_array
+from matplotlib.markers import MarkerStyle
+from matplotlib.transforms import IdentityTransform
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from functools import cached_property
 from logger_config import setup_logger
 
 logger = setup_logger('Visualizer')
 
+# PNG encoder settings - low zlib effort is several times faster than the
+# default for a modestly larger file
+PNG_SAVE_KWARGS = {'compress_level': 3, 'optimize': False}
+
+# Nanoseconds in a day, for turning datetime differences into whole days
+NS_PER_DAY = 86_400 * 10**9
+
+# Screen resolution for saved charts - pass dpi=300 to a plot method for print
+DEFAULT_DPI = 150
+
+
+def _savefig(fig, path, dpi=DEFAULT_DPI):
+    """Save a chart as a fast-encoded PNG, creating its directory if needed"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fig.savefig(path, dpi=dpi, bbox_inches='tight', pil_kwargs=PNG_SAVE_KWARGS)
+
+
+def _match_tz(dates, tz):
+    """
+    Express trade dates in the equity curve's timezone so date lookups line up
+    
+    Aware dates are converted (or made naive wall time for a naive curve);
+    naive dates are taken to be wall time in tz.
+    """
+    if dates.tz is None:
+        return dates if tz is None else dates.tz_localize(tz)
+    return dates.tz_convert(tz) if tz is not None else dates.tz_localize(None)
+
 
 class PerformanceVisualizer:
     """
@@ -35,17 +71,106 @@ class PerformanceVisualizer:
         self.trades = backtest_engine.trades
         self.equity_curve = backtest_engine.equity_curve
         
+        # Per-trade columns extracted once and shared by every chart
+        n = len(self.trades)
+        self._profits = np.fromiter((t['profit'] for t in self.trades), dtype=np.float64, count=n)
+        # DatetimeIndex keeps the trades' timezone (yfinance dates are tz-aware)
+        self._entry_dates = pd.DatetimeIndex([t['entry_date'] for t in self.trades])
+        self._exit_dates = pd.DatetimeIndex([t['exit_date'] for t in self.trades])
+        # Whole days held from the epoch nanoseconds in one subtraction
+        # (floor division matches Timedelta.days)
+        held_ns = self._exit_dates.as_unit('ns').asi8 - self._entry_dates.as_unit('ns').asi8
+        self._durations = held_ns // NS_PER_DAY
+        
+        # One reusable figure per chart layout (see _get_fig); figures are only
+        # kept open between charts while create_all_charts is batching
+        self._fig_cache = {}
+        self._batching = False
+        
         # Set style
         plt.style.use('seaborn-v0_8-darkgrid')
         
         logger.info("PerformanceVisualizer initialized")
     
-    def plot_equity_curve(self, save_path='charts/equity_curve.png'):
+    def _get_fig(self, key, figsize):
+        """
+        Get the figure for a chart layout, cleared and ready to draw on
+        
+        Built on first use and reused by later charts with the same layout,
+        so a batch of charts doesn't construct a new figure each time.
+        """
+        fig = self._fig_cache.get(key)
+        if fig is None or not plt.fignum_exists(fig.number):
+            fig = plt.figure(figsize=figsize)
+            self._fig_cache[key] = fig
+        else:
+            fig.clf()
+        return fig
+    
+    def _release_fig(self, key):
+        """Close a chart's figure once it's saved, unless a batch will reuse it"""
+        if not self._batching:
+            plt.close(self._fig_cache.pop(key))
+    
+    def _close_figs(self):
+        """Release every cached figure"""
+        for fig in self._fig_cache.values():
+            plt.close(fig)
+        self._fig_cache.clear()
+    
+    @cached_property
+    def equity_df(self):
+        """Equity curve as a DataFrame, built on first use and shared by every chart"""
+        return pd.DataFrame(self.equity_curve)
+    
+    @cached_property
+    def _equity_dates(self):
+        return pd.DatetimeIndex(self.equity_df['date'])
+    
+    @cached_property
+    def _equity_values(self):
+        return self.equity_df['equity'].to_numpy(dtype=np.float64)
+    
+    def _trade_markers(self, ax, entry_dates, entry_equity, exit_dates, exit_equity):
+        """
+        Every entry (o) and exit (x) marker as a single PathCollection
+        
+        One artist for the whole backtest instead of a scatter per marker
+        type and color. Green for winning trades, red for losers.
+        """
+        won = self._profits > 0
+        rgba = to_rgba_array(np.where(won, 'green', 'red'), alpha=0.7)
+        
+        # Entries first, then exits; trades whose dates aren't on the curve are dropped
+        offsets = np.column_stack([
+            mdates.date2num(entry_dates.append(exit_dates)),
+            np.concatenate([entry_equity, exit_equity]),
+        ])
+        is_entry = np.arange(len(offsets)) < len(entry_dates)
+        keep = ~np.isnan(offsets[:, 1])
+        
+        # Same paths and line widths scatter would use: the filled circle gets
+        # a patch-width edge, the unfilled 'x' is drawn by a line-width stroke
+        circle, cross = (MarkerStyle(m) for m in ('o', 'x'))
+        paths = [circle.get_path().transformed(circle.get_transform()),
+                 cross.get_path().transformed(cross.get_transform())]
+        colors = np.concatenate([rgba, rgba])[keep]
+        widths = np.where(is_entry, plt.rcParams['patch.linewidth'], plt.rcParams['lines.linewidth'])
+        
+        return PathCollection(
+            [paths[0] if e else paths[1] for e in is_entry[keep]],
+            sizes=[100], offsets=offsets[keep], offset_transform=ax.transData,
+            transform=IdentityTransform(), facecolors=colors, edgecolors=colors,
+            linewidths=widths[keep], zorder=5)
+    
+    def plot_equity_curve(self, save_path='charts/equity_curve.png', show=False, dpi=DEFAULT_DPI):
         """
         Plot equity curve showing capital growth over time
         
         Args:
             save_path (str): Where to save the chart
+            show (bool): Also display the chart with plt.show()
+            dpi (int): Output resolution (default: DEFAULT_DPI)
         """
         logger.info("Creating equity curve chart...")
         
@@ -53,34 +178,33 @@ class PerformanceVisualizer:
             logger.warning("No equity data to plot!")
             return
         
-        # Convert to DataFrame
-        df = pd.DataFrame(self.equity_curve)
-        
         # Create figure
-        fig, ax = plt.subplots(figsize=(12, 6))
+        fig = self._get_fig('wide', (12, 6))
+        ax = fig.subplots()
         
         # Plot equity curve
-        ax.plot(df['date'], df['equity'], linewidth=2, color='#2E86AB', label='Portfolio Value')
+        dates, equity = self._equity_dates, self._equity_values
+        ax.plot(dates, equity, linewidth=2, color='#2E86AB', label='Portfolio Value')
         
         # Add starting capital line
-        ax.axhline(y=self.engine.capital - sum(t['profit'] for t in self.trades), 
+        ax.axhline(y=self.engine.capital - self._profits.sum(), 
                    color='gray', linestyle='--', alpha=0.5, label='Starting Capital')
         
-        # Mark trades
-        for trade in self.trades:
-            entry_date = trade['entry_date']
-            exit_date = trade['exit_date']
-            
-            # Find equity at these dates
-            entry_equity = df[df['date'] == entry_date]['equity'].iloc[0] if len(df[df['date'] == entry_date]) > 0 else None
-            exit_equity = df[df['date'] == exit_date]['equity'].iloc[0] if len(df[df['date'] == exit_date]) > 0 else None
-            
-            if entry_equity is not None:
-                color = 'green' if trade['profit'] > 0 else 'red'
-                ax.scatter(entry_date, entry_equity, color=color, s=100, zorder=5, alpha=0.7)
-            
-            if exit_equity is not None:
-                ax.scatter(exit_date, exit_equity, color=color, s=100, marker='x', zorder=5, alpha=0.7)
+        # Mark trades - one date-indexed lookup for all entries/exits instead of
+        # scanning the equity curve per trade (first row wins on repeated dates)
+        equity_by_date = pd.Series(equity, index=dates)
+        equity_by_date = equity_by_date[~equity_by_date.index.duplicated()]
+        entry_dates = _match_tz(self._entry_dates, dates.tz)
+        exit_dates = _match_tz(self._exit_dates, dates.tz)
+        entry_equity = equity_by_date.reindex(entry_dates).to_numpy()
+        exit_equity = equity_by_date.reindex(exit_dates).to_numpy()
+        markers = self._trade_markers(ax, entry_dates, entry_equity, exit_dates, exit_equity)
+        ax.add_collection(markers)
+        
+        n_expected = 2 * len(self.trades)
+        if len(markers.get_offsets()) != n_expected:
+            logger.warning(f"Only {len(markers.get_offsets())}/{n_expected} trade markers matched "
+                           f"an equity-curve date")
         
         # Format
         ax.set_xlabel('Date', fontsize=12, fontweight='bold')
@@ -91,34 +215,35 @@ class PerformanceVisualizer:
         
         # Format x-axis dates
         ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
-        plt.xticks(rotation=45)
+        ax.tick_params(axis='x', labelrotation=45)
         
         # Add annotations
-        final_equity = df['equity'].iloc[-1]
-        starting_equity = df['equity'].iloc[0]
+        final_equity = equity[-1]
+        starting_equity = equity[0]
         total_return = ((final_equity - starting_equity) / starting_equity) * 100
         
         textstr = f'Starting: ${starting_equity:,.2f}\nFinal: ${final_equity:,.2f}\nReturn: {total_return:.2f}%'
         ax.text(0.02, 0.98, textstr, transform=ax.transAxes, fontsize=10,
                 verticalalignment='top', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
         
-        plt.tight_layout()
+        fig.tight_layout()
         
         # Save
-        import os
-        os.makedirs('charts', exist_ok=True)
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        _savefig(fig, save_path, dpi)
         logger.info(f"✅ Equity curve saved to {save_path}")
         
-        plt.show()
-        plt.close()
+        if show:
+            plt.show()
+        self._release_fig('wide')
     
-    def plot_trades(self, save_path='charts/trades.png'):
+    def plot_trades(self, save_path='charts/trades.png', show=False, dpi=DEFAULT_DPI):
         """
         Plot individual trades showing profit/loss
         
         Args:
             save_path (str): Where to save the chart
+            show (bool): Also display the chart with plt.show()
+            dpi (int): Output resolution (default: DEFAULT_DPI)
         """
         logger.info("Creating trades chart...")
         
@@ -128,22 +253,19 @@ class PerformanceVisualizer:
         
         # Extract trade data
         trade_nums = list(range(1, len(self.trades) + 1))
-        profits = [t['profit'] for t in self.trades]
-        colors = ['green' if p > 0 else 'red' for p in profits]
+        profits = self._profits
+        colors = np.where(profits > 0, 'green', 'red')
         
         # Create figure
-        fig, ax = plt.subplots(figsize=(10, 6))
+        fig = self._get_fig('single', (10, 6))
+        ax = fig.subplots()
         
         # Bar chart
         bars = ax.bar(trade_nums, profits, color=colors, alpha=0.7, edgecolor='black')
         
-        # Add value labels on bars
-        for bar, profit in zip(bars, profits):
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'${profit:.2f}',
-                   ha='center', va='bottom' if profit > 0 else 'top',
-                   fontsize=9, fontweight='bold')
+        # Add value labels on bars (bar_label puts losses below their bar)
+        ax.bar_label(bars, labels=[f'${p:.2f}' for p in profits],
+                     padding=3, fontsize=9, fontweight='bold')
         
         # Format
         ax.set_xlabel('Trade Number', fontsize=12, fontweight='bold')
@@ -153,32 +275,33 @@ class PerformanceVisualizer:
         ax.grid(True, alpha=0.3, axis='y')
         
         # Stats box
-        winning = len([p for p in profits if p > 0])
-        losing = len([p for p in profits if p <= 0])
-        win_rate = (winning / len(profits)) * 100 if profits else 0
+        winning = int((profits > 0).sum())
+        losing = len(profits) - winning
+        win_rate = winning / len(profits) * 100
         
         textstr = f'Total Trades: {len(profits)}\nWinners: {winning}\nLosers: {losing}\nWin Rate: {win_rate:.1f}%'
         ax.text(0.98, 0.98, textstr, transform=ax.transAxes, fontsize=10,
                 verticalalignment='top', horizontalalignment='right',
                 bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.5))
         
-        plt.tight_layout()
+        fig.tight_layout()
         
         # Save
-        import os
-        os.makedirs('charts', exist_ok=True)
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        _savefig(fig, save_path, dpi)
         logger.info(f"✅ Trades chart saved to {save_path}")
         
-        plt.show()
-        plt.close()
+        if show:
+            plt.show()
+        self._release_fig('single')
     
-    def plot_trade_duration(self, save_path='charts/trade_duration.png'):
+    def plot_trade_duration(self, save_path='charts/trade_duration.png', show=False, dpi=DEFAULT_DPI):
         """
         Plot how long each trade was held
         
         Args:
             save_path (str): Where to save the chart
+            show (bool): Also display the chart with plt.show()
+            dpi (int): Output resolution (default: DEFAULT_DPI)
         """
         logger.info("Creating trade duration chart...")
         
@@ -186,27 +309,20 @@ class PerformanceVisualizer:
             logger.warning("No trades to plot!")
             return
         
-        # Calculate durations
-        durations = []
-        for trade in self.trades:
-            duration = (trade['exit_date'] - trade['entry_date']).days
-            durations.append(duration)
+        durations = self._durations
         
         # Create figure
-        fig, ax = plt.subplots(figsize=(10, 6))
+        fig = self._get_fig('single', (10, 6))
+        ax = fig.subplots()
         
         trade_nums = list(range(1, len(durations) + 1))
-        colors = ['green' if self.trades[i]['profit'] > 0 else 'red' for i in range(len(self.trades))]
+        colors = np.where(self._profits > 0, 'green', 'red')
         
         bars = ax.bar(trade_nums, durations, color=colors, alpha=0.7, edgecolor='black')
         
         # Add labels
-        for bar, dur in zip(bars, durations):
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{dur}d',
-                   ha='center', va='bottom',
-                   fontsize=9, fontweight='bold')
+        ax.bar_label(bars, labels=[f'{d}d' for d in durations],
+                     padding=3, fontsize=9, fontweight='bold')
         
         # Format
         ax.set_xlabel('Trade Number', fontsize=12, fontweight='bold')
@@ -221,23 +337,24 @@ class PerformanceVisualizer:
                 verticalalignment='top', horizontalalignment='right',
                 bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.5))
         
-        plt.tight_layout()
+        fig.tight_layout()
         
         # Save
-        import os
-        os.makedirs('charts', exist_ok=True)
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        _savefig(fig, save_path, dpi)
         logger.info(f"✅ Trade duration chart saved to {save_path}")
         
-        plt.show()
-        plt.close()
+        if show:
+            plt.show()
+        self._release_fig('single')
     
-    def create_performance_dashboard(self, save_path='charts/dashboard.png'):
+    def create_performance_dashboard(self, save_path='charts/dashboard.png', show=False, dpi=DEFAULT_DPI):
         """
         Create a comprehensive 4-panel dashboard
         
         Args:
             save_path (str): Where to save the chart
+            show (bool): Also display the chart with plt.show()
+            dpi (int): Output resolution (default: DEFAULT_DPI)
         """
         logger.info("Creating performance dashboard...")
         
@@ -246,22 +363,21 @@ class PerformanceVisualizer:
             return
         
         # Create 2x2 subplot grid
-        fig = plt.figure(figsize=(16, 12))
+        fig = self._get_fig('dashboard', (16, 12))
         
         # 1. Equity Curve (top left)
-        ax1 = plt.subplot(2, 2, 1)
-        df = pd.DataFrame(self.equity_curve)
-        ax1.plot(df['date'], df['equity'], linewidth=2, color='#2E86AB')
+        ax1 = fig.add_subplot(2, 2, 1)
+        ax1.plot(self._equity_dates, self._equity_values, linewidth=2, color='#2E86AB')
         ax1.set_title('Equity Curve', fontsize=12, fontweight='bold')
         ax1.set_ylabel('Portfolio Value ($)')
         ax1.grid(True, alpha=0.3)
         ax1.xaxis.set_major_formatter(mdates.DateFormatter('%b'))
         
         # 2. Trade Results (top right)
-        ax2 = plt.subplot(2, 2, 2)
+        ax2 = fig.add_subplot(2, 2, 2)
         trade_nums = list(range(1, len(self.trades) + 1))
-        profits = [t['profit'] for t in self.trades]
-        colors = ['green' if p > 0 else 'red' for p in profits]
+        profits = self._profits
+        colors = np.where(profits > 0, 'green', 'red')
         ax2.bar(trade_nums, profits, color=colors, alpha=0.7)
         ax2.set_title('Trade Results', fontsize=12, fontweight='bold')
         ax2.set_ylabel('Profit/Loss ($)')
@@ -270,8 +386,8 @@ class PerformanceVisualizer:
         ax2.grid(True, alpha=0.3, axis='y')
         
         # 3. Trade Duration (bottom left)
-        ax3 = plt.subplot(2, 2, 3)
-        durations = [(t['exit_date'] - t['entry_date']).days for t in self.trades]
+        ax3 = fig.add_subplot(2, 2, 3)
+        durations = self._durations
         ax3.bar(trade_nums, durations, color=colors, alpha=0.7)
         ax3.set_title('Trade Duration', fontsize=12, fontweight='bold')
         ax3.set_ylabel('Days Held')
@@ -279,7 +395,7 @@ class PerformanceVisualizer:
         ax3.grid(True, alpha=0.3, axis='y')
         
         # 4. Performance Stats (bottom right)
-        ax4 = plt.subplot(2, 2, 4)
+        ax4 = fig.add_subplot(2, 2, 4)
         ax4.axis('off')
         
         # Calculate stats
@@ -318,25 +434,29 @@ TRADE METRICS:
         fig.suptitle(f'Trading Performance Dashboard - {self.engine.symbol}',
                     fontsize=16, fontweight='bold', y=0.98)
         
-        plt.tight_layout(rect=[0, 0.03, 1, 0.96])
+        fig.tight_layout(rect=[0, 0.03, 1, 0.96])
         
         # Save
-        import os
-        os.makedirs('charts', exist_ok=True)
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        _savefig(fig, save_path, dpi)
         logger.info(f"✅ Dashboard saved to {save_path}")
         
-        plt.show()
-        plt.close()
+        if show:
+            plt.show()
+        self._release_fig('dashboard')
     
-    def create_all_charts(self):
-        """Create all visualization charts at once"""
+    def create_all_charts(self, show=False, dpi=DEFAULT_DPI):
+        """Create all visualization charts at once (show=True also opens each one)"""
         logger.info("Creating all visualization charts...")
         
-        self.plot_equity_curve()
-        self.plot_trades()
-        self.plot_trade_duration()
-        self.create_performance_dashboard()
+        self._batching = True
+        try:
+            self.plot_equity_curve(show=show, dpi=dpi)
+            self.plot_trades(show=show, dpi=dpi)
+            self.plot_trade_duration(show=show, dpi=dpi)
+            self.create_performance_dashboard(show=show, dpi=dpi)
+        finally:
+            self._batching = False
+            self._close_figs()
         
         logger.info("✅ All charts created successfully!")
         logger.info("   Check the 'charts/' directory for your visualizations")
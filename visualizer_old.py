@@ -1,18 +1,71 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import matplotlib
+matplotlib.use('Agg')  # File-only renderer - charts are never shown on screen
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.ticker import FuncFormatter
 from datetime import datetime
 import numpy as np
+from indicators import njit
+from visualizer import (DEFAULT_DPI, MAX_PLOT_POINTS, chart_profile, lttb_indices,
+                        save_png, warm_font_cache)
 
-# Set style for beautiful charts
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
+# Scatter colors indexed by (return > 0): 0 = loss/flat, 1 = win
+RETURN_COLORS = np.array(['#EF476F', '#06D6A0'])
+
+
+@njit(cache=True)
+def _aggregate(capital, pnl, starting_capital):
+    """
+    Every metric of calculate_all_metrics in one pass over each array
+    (compiled with numba when available)
+    
+    Returns:
+        tuple: (total_return_pct, final_capital, total_trades, winning_trades,
+                losing_trades, avg_win, avg_loss, profit_factor, max_drawdown,
+                peak_capital)
+    """
+    final_capital = starting_capital
+    peak = starting_capital
+    max_drawdown = 0.0
+    for i in range(capital.size):
+        c = capital[i]
+        if i == 0 or c > peak:
+            peak = c
+        drawdown = (peak - c) / peak * 100.0
+        if drawdown > max_drawdown:
+            max_drawdown = drawdown
+        final_capital = c
+    
+    winning_trades = 0
+    losing_trades = 0
+    total_wins = 0.0
+    total_losses = 0.0
+    for i in range(pnl.size):
+        p = pnl[i]
+        if p > 0:
+            winning_trades += 1
+            total_wins += p
+        elif p < 0:
+            losing_trades += 1
+            total_losses -= p
+    
+    total_return_pct = (final_capital - starting_capital) / starting_capital * 100.0
+    avg_win = total_wins / winning_trades if winning_trades > 0 else 0.0
+    avg_loss = total_losses / losing_trades if losing_trades > 0 else 0.0
+    profit_factor = total_wins / total_losses if total_losses > 0 else np.inf
+    
+    return (total_return_pct, final_capital, pnl.size, winning_trades, losing_trades,
+            avg_win, avg_loss, profit_factor, max_drawdown, peak)
 
 class PerformanceVisualizer:
     """
     Creates portfolio-quality visualizations of trading performance
     """
     
+    # Chart style is applied on the first chart, not at import
+    _style_set = False
+    
     def __init__(self, results_df):
         """
         Initialize with backtest results DataFrame
@@ -23,17 +76,60 @@ class PerformanceVisualizer:
             DataFrame with columns: timestamp, capital, trade_pnl, etc.
         """
         self.df = results_df
-        self.starting_capital = results_df['capital'].iloc[0] if len(results_df) > 0 else 1000
+        warm_font_cache()
+        
+        # Intermediates shared by every chart and metric - computed once here
+        # instead of re-filtering the frame in each method
+        self._capital = self.df['capital'].to_numpy(np.float64)
+        self.starting_capital = self._capital[0] if self._capital.size > 0 else 1000
+        self._trades_mask = (self.df['trade_pnl'] != 0).to_numpy()
+        self._trades_df = self.df.loc[self._trades_mask]
+        self._pnl = self._trades_df['trade_pnl'].to_numpy()
+        self._peak = np.maximum.accumulate(self._capital)
+        self._drawdown = (self._capital - self._peak) / self._peak * 100
+    
+    def _apply_style(self):
+        """Set the chart style once - seaborn is only imported when something is plotted"""
+        if PerformanceVisualizer._style_set:
+            return
+        import seaborn as sns
+        matplotlib.style.use('seaborn-v0_8-darkgrid')
+        sns.set_palette("husl")
+        PerformanceVisualizer._style_set = True
+    
+    @staticmethod
+    def _chart_figure(fig=None):
+        """
+        Return a blank 14x10 Agg figure to draw a chart on
         
-    def create_equity_curve(self, save_path='equity_curve.png'):
+        A figure passed in is cleared and its subplot margins reset, so
+        several charts can be rendered on one canvas in turn.
+        """
+        if fig is None:
+            fig = Figure(figsize=(14, 10))
+            FigureCanvasAgg(fig)
+        else:
+            fig.clf()
+            rc = matplotlib.rcParams
+            fig.subplotpars.update(*(rc[f'figure.subplot.{k}'] for k in
+                                     ('left', 'bottom', 'right', 'top', 'wspace', 'hspace')))
+        return fig
+        
+    @chart_profile('PerformanceVisualizer.create_equity_curve')
+    def create_equity_curve(self, save_path='equity_curve.png', max_points=MAX_PLOT_POINTS, dpi=DEFAULT_DPI, fig=None):
         """
         Create beautiful equity curve showing capital growth over time
+        (series longer than max_points are LTTB-downsampled before plotting)
         """
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10), 
-                                        gridspec_kw={'height_ratios': [3, 1]})
+        self._apply_style()
+        fig = self._chart_figure(fig)
+        ax1, ax2 = fig.subplots(2, 1, gridspec_kw={'height_ratios': [3, 1]})
         
         # Top chart: Equity Curve
-        ax1.plot(self.df.index, self.df['capital'], 
+        capital = self._capital
+        idx = lttb_indices(capital, max_points)
+        x = self.df.index[idx]
+        ax1.plot(x, capital[idx], 
                 linewidth=2.5, color='#2E86AB', label='Portfolio Value')
         
         # Add starting capital reference line
@@ -41,11 +137,11 @@ class PerformanceVisualizer:
                    linestyle='--', alpha=0.5, label='Starting Capital')
         
         # Fill area under curve
-        ax1.fill_between(self.df.index, self.starting_capital, self.df['capital'], 
+        ax1.fill_between(x, self.starting_capital, capital[idx], 
                         alpha=0.3, color='#2E86AB')
         
         # Calculate key metrics
-        final_capital = self.df['capital'].iloc[-1]
+        final_capital = capital[-1]
         total_return_pct = ((final_capital - self.starting_capital) / self.starting_capital) * 100
         max_drawdown = self.calculate_max_drawdown()
         
@@ -61,41 +157,49 @@ class PerformanceVisualizer:
         ax1.grid(True, alpha=0.3)
         
         # Format y-axis as currency
-        ax1.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
+        ax1.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'${x:,.0f}'))
         
         # Bottom chart: Drawdown
-        drawdown = self.calculate_drawdown_series()
-        ax2.fill_between(drawdown.index, 0, drawdown, 
+        dd_idx = lttb_indices(self._drawdown, max_points)
+        ax2.fill_between(self.df.index[dd_idx], 0, self._drawdown[dd_idx], 
                         color='#A23B72', alpha=0.7, label='Drawdown %')
         ax2.set_ylabel('Drawdown (%)', fontsize=12, fontweight='bold')
         ax2.set_xlabel('Trade Number', fontsize=12, fontweight='bold')
         ax2.legend(loc='lower left', fontsize=10)
         ax2.grid(True, alpha=0.3)
         
-        plt.tight_layout()
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        fig.tight_layout()
+        save_png(fig, save_path, dpi)
         print(f"✅ Equity curve saved: {save_path}")
-        plt.close()
         
         return save_path
     
-    def create_trade_distribution(self, save_path='trade_distribution.png'):
+    @chart_profile('PerformanceVisualizer.create_trade_distribution')
+    def create_trade_distribution(self, save_path='trade_distribution.png', max_points=MAX_PLOT_POINTS, dpi=DEFAULT_DPI, fig=None):
         """
         Create charts showing win/loss distribution and trade sizes
+        (per-trade series longer than max_points are LTTB-downsampled)
         """
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(14, 10))
-        
-        # Filter to only rows with trades
-        trades_df = self.df[self.df['trade_pnl'] != 0].copy()
+        # Only rows with trades
+        pnl = self._pnl
         
-        if len(trades_df) == 0:
+        if pnl.size == 0:
             print("⚠️ No trades to visualize!")
             return None
         
-        # Chart 1: Win/Loss Count
-        wins = (trades_df['trade_pnl'] > 0).sum()
-        losses = (trades_df['trade_pnl'] < 0).sum()
+        # Everything the four panels need, derived once from the cached P&L
+        # (trade rows never have zero P&L, so everything that isn't a win is a loss)
+        pos_mask = pnl > 0
+        wins = int(pos_mask.sum())
+        losses = pnl.size - wins
+        cumulative_pnl = np.cumsum(pnl)
+        trade_returns = pnl * (100.0 / self.starting_capital)
         
+        self._apply_style()
+        fig = self._chart_figure(fig)
+        ((ax1, ax2), (ax3, ax4)) = fig.subplots(2, 2)
+        
+        # Chart 1: Win/Loss Count
         colors = ['#06D6A0', '#EF476F']
         ax1.bar(['Wins', 'Losses'], [wins, losses], color=colors, alpha=0.8)
         ax1.set_title('Win/Loss Distribution', fontsize=14, fontweight='bold')
@@ -103,24 +207,24 @@ class PerformanceVisualizer:
         
         # Add percentages on bars
         total_trades = wins + losses
-        for i, (label, value) in enumerate(zip(['Wins', 'Losses'], [wins, losses])):
-            pct = (value / total_trades) * 100 if total_trades > 0 else 0
-            ax1.text(i, value, f'{value}\n({pct:.1f}%)', 
-                    ha='center', va='bottom', fontweight='bold')
+        labels = [f'{v}\n({v / total_trades * 100:.1f}%)' for v in (wins, losses)]
+        ax1.bar_label(ax1.containers[0], labels=labels, fontweight='bold')
         
         # Chart 2: P&L Distribution (Histogram)
-        ax2.hist(trades_df['trade_pnl'], bins=20, color='#118AB2', 
-                alpha=0.7, edgecolor='black')
+        # Binned in numpy and drawn as one step artist rather than 20 bar patches
+        counts, edges = np.histogram(pnl, bins=20)
+        ax2.stairs(counts, edges, fill=True, color='#118AB2', 
+                  alpha=0.7, edgecolor='black')
         ax2.axvline(x=0, color='red', linestyle='--', linewidth=2, alpha=0.7)
         ax2.set_title('Profit/Loss Distribution', fontsize=14, fontweight='bold')
         ax2.set_xlabel('P&L per Trade ($)', fontsize=11)
         ax2.set_ylabel('Frequency', fontsize=11)
         
         # Chart 3: Cumulative P&L
-        cumulative_pnl = trades_df['trade_pnl'].cumsum()
-        ax3.plot(range(len(cumulative_pnl)), cumulative_pnl, 
+        idx = lttb_indices(cumulative_pnl, max_points)
+        ax3.plot(idx, cumulative_pnl[idx], 
                 linewidth=2.5, color='#073B4C')
-        ax3.fill_between(range(len(cumulative_pnl)), 0, cumulative_pnl, 
+        ax3.fill_between(idx, 0, cumulative_pnl[idx], 
                         alpha=0.3, color='#073B4C')
         ax3.axhline(y=0, color='red', linestyle='--', alpha=0.5)
         ax3.set_title('Cumulative P&L', fontsize=14, fontweight='bold')
@@ -129,9 +233,9 @@ class PerformanceVisualizer:
         ax3.grid(True, alpha=0.3)
         
         # Chart 4: Trade Performance Over Time
-        trade_returns = (trades_df['trade_pnl'] / self.starting_capital) * 100
-        colors_scatter = ['#06D6A0' if x > 0 else '#EF476F' for x in trade_returns]
-        ax4.scatter(range(len(trade_returns)), trade_returns, 
+        idx = lttb_indices(trade_returns, max_points)
+        colors_scatter = RETURN_COLORS[pos_mask[idx].astype(np.int8)]
+        ax4.scatter(idx, trade_returns[idx], 
                    c=colors_scatter, alpha=0.6, s=50)
         ax4.axhline(y=0, color='black', linestyle='-', alpha=0.3)
         ax4.set_title('Return per Trade (%)', fontsize=14, fontweight='bold')
@@ -139,18 +243,20 @@ class PerformanceVisualizer:
         ax4.set_ylabel('Return (%)', fontsize=11)
         ax4.grid(True, alpha=0.3)
         
-        plt.tight_layout()
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        fig.tight_layout()
+        save_png(fig, save_path, dpi)
         print(f"✅ Trade distribution saved: {save_path}")
-        plt.close()
         
         return save_path
     
-    def create_performance_summary(self, save_path='performance_summary.png'):
+    @chart_profile('PerformanceVisualizer.create_performance_summary')
+    def create_performance_summary(self, save_path='performance_summary.png', max_points=MAX_PLOT_POINTS, dpi=DEFAULT_DPI, fig=None):
         """
         Create a comprehensive performance summary dashboard
+        (series longer than max_points are LTTB-downsampled before plotting)
         """
-        fig = plt.figure(figsize=(14, 10))
+        self._apply_style()
+        fig = self._chart_figure(fig)
         gs = fig.add_gridspec(3, 2, hspace=0.3, wspace=0.3)
         
         # Calculate all metrics
@@ -158,14 +264,16 @@ class PerformanceVisualizer:
         
         # Main equity curve (top, spanning both columns)
         ax_main = fig.add_subplot(gs[0, :])
-        ax_main.plot(self.df.index, self.df['capital'], 
+        capital = self._capital
+        idx = lttb_indices(capital, max_points)
+        ax_main.plot(self.df.index[idx], capital[idx], 
                     linewidth=3, color='#2E86AB')
-        ax_main.fill_between(self.df.index, self.starting_capital, 
-                            self.df['capital'], alpha=0.3, color='#2E86AB')
+        ax_main.fill_between(self.df.index[idx], self.starting_capital, 
+                            capital[idx], alpha=0.3, color='#2E86AB')
         ax_main.set_title('Portfolio Performance', fontsize=16, fontweight='bold')
         ax_main.set_ylabel('Capital ($)', fontsize=12)
         ax_main.grid(True, alpha=0.3)
-        ax_main.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
+        ax_main.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'${x:,.0f}'))
         
         # Metrics table (middle left)
         ax_metrics = fig.add_subplot(gs[1, 0])
@@ -208,11 +316,12 @@ class PerformanceVisualizer:
         
         # Trade returns scatter (bottom, spanning both columns)
         ax_scatter = fig.add_subplot(gs[2, :])
-        trades_df = self.df[self.df['trade_pnl'] != 0]
+        trades_df = self._trades_df
         if len(trades_df) > 0:
-            trade_returns = (trades_df['trade_pnl'] / self.starting_capital) * 100
-            colors_scatter = ['#06D6A0' if x > 0 else '#EF476F' for x in trade_returns]
-            ax_scatter.scatter(range(len(trade_returns)), trade_returns, 
+            trade_returns = (trades_df['trade_pnl'].to_numpy() / self.starting_capital) * 100
+            idx = lttb_indices(trade_returns, max_points)
+            colors_scatter = RETURN_COLORS[(trade_returns[idx] > 0).astype(np.int8)]
+            ax_scatter.scatter(idx, trade_returns[idx], 
                              c=colors_scatter, alpha=0.6, s=50)
             ax_scatter.axhline(y=0, color='black', linestyle='-', linewidth=0.8)
             ax_scatter.set_title('Return per Trade', fontsize=14, fontweight='bold')
@@ -220,34 +329,20 @@ class PerformanceVisualizer:
             ax_scatter.set_ylabel('Return (%)', fontsize=11)
             ax_scatter.grid(True, alpha=0.3)
         
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        save_png(fig, save_path, dpi)
         print(f"✅ Performance summary saved: {save_path}")
-        plt.close()
         
         return save_path
     
+    @chart_profile('PerformanceVisualizer.calculate_all_metrics')
     def calculate_all_metrics(self):
         """Calculate all performance metrics"""
-        trades_df = self.df[self.df['trade_pnl'] != 0].copy()
-        
-        final_capital = self.df['capital'].iloc[-1] if len(self.df) > 0 else self.starting_capital
-        total_return_pct = ((final_capital - self.starting_capital) / self.starting_capital) * 100
-        
-        total_trades = len(trades_df)
-        winning_trades = (trades_df['trade_pnl'] > 0).sum()
-        losing_trades = (trades_df['trade_pnl'] < 0).sum()
+        (total_return_pct, final_capital, total_trades, winning_trades, losing_trades,
+         avg_win, avg_loss, profit_factor, max_drawdown, peak_capital) = _aggregate(
+            self._capital, self._pnl.astype(np.float64),
+            float(self.starting_capital))
         win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
         
-        wins = trades_df[trades_df['trade_pnl'] > 0]['trade_pnl']
-        losses = trades_df[trades_df['trade_pnl'] < 0]['trade_pnl']
-        
-        avg_win = wins.mean() if len(wins) > 0 else 0
-        avg_loss = abs(losses.mean()) if len(losses) > 0 else 0
-        
-        total_wins = wins.sum() if len(wins) > 0 else 0
-        total_losses = abs(losses.sum()) if len(losses) > 0 else 0
-        profit_factor = total_wins / total_losses if total_losses > 0 else float('inf')
-        
         return {
             'total_return_pct': total_return_pct,
             'final_capital': final_capital,
@@ -258,21 +353,17 @@ class PerformanceVisualizer:
             'avg_win': avg_win,
             'avg_loss': avg_loss,
             'profit_factor': profit_factor,
-            'max_drawdown': self.calculate_max_drawdown(),
-            'peak_capital': self.df['capital'].max()
+            'max_drawdown': max_drawdown,
+            'peak_capital': peak_capital
         }
     
     def calculate_max_drawdown(self):
         """Calculate maximum drawdown percentage"""
-        peak = self.df['capital'].expanding(min_periods=1).max()
-        drawdown = (self.df['capital'] - peak) / peak * 100
-        return abs(drawdown.min())
+        return abs(self._drawdown.min()) if self._drawdown.size else 0.0
     
     def calculate_drawdown_series(self):
         """Calculate drawdown series for plotting"""
-        peak = self.df['capital'].expanding(min_periods=1).max()
-        drawdown = (self.df['capital'] - peak) / peak * 100
-        return drawdown
+        return pd.Series(self._drawdown, index=self.df.index)
     
     def generate_all_charts(self):
         """Generate all visualization charts"""
@@ -281,15 +372,16 @@ class PerformanceVisualizer:
         
         charts = []
         
-        # Generate each chart
-        chart1 = self.create_equity_curve()
+        # Generate each chart on one shared figure, cleared in between
+        fig = self._chart_figure()
+        chart1 = self.create_equity_curve(fig=fig)
         charts.append(chart1)
         
-        chart2 = self.create_trade_distribution()
+        chart2 = self.create_trade_distribution(fig=fig)
         if chart2:
             charts.append(chart2)
         
-        chart3 = self.create_performance_summary()
+        chart3 = self.create_performance_summary(fig=fig)
         charts.append(chart3)
         
         print("=" * 50)
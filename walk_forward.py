@@ -1,9 +1,123 @@
+import io
+import os
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
+from indicators import njit, prange, rsi_wilder
+
+
+def _precompute_rsi(close, period=14):
+    """
+    Wilder RSI for every bar in one pass, shifted for the bar loop
+    
+    Args:
+        close: 1-D array of close prices
+        period: RSI period (default: 14)
+    
+    Returns:
+        np.ndarray: float64 array where rsi[i] uses closes up to i-1, so
+                    bar i never sees its own close (NaN during warm-up)
+    """
+    close = np.asarray(close, dtype=np.float64)
+    rsi = np.full(close.size, np.nan)
+    rsi[1:] = rsi_wilder(close, period)[:-1]
+    return np.ascontiguousarray(rsi)
+
+
+def _mode_int(values):
+    """
+    Most common value of non-negative integers (smallest one on ties, like pandas mode()[0])
+    """
+    return int(np.bincount(np.asarray(values, dtype=np.int64)).argmax())
+
+
+@njit(cache=True, inline='always')
+def _run_bt(close, rsi, rsi_buy, rsi_sell, stop_loss, profit_target, initial_capital):
+    """
+    Bar loop of the RSI strategy on plain arrays (compiled with numba when available)
+    
+    Returns:
+        tuple: (final_capital, trades, n_trades) - trades[:n_trades] holds
+               each closed trade's P&L, including the final forced exit
+    """
+    capital = initial_capital
+    position = 0  # 0 = flat, 1 = long
+    entry_price = 0.0
+    trades = np.empty(close.size, np.float64)
+    n_trades = 0
+    
+    for i in range(14, close.size):
+        current_price = close[i]
+        
+        # Exit logic
+        if position == 1:
+            pnl_pct = (current_price - entry_price) / entry_price
+            if pnl_pct <= -stop_loss or pnl_pct >= profit_target or rsi[i] > rsi_sell:
+                trade_pnl = (current_price - entry_price) * (capital / entry_price)
+                capital += trade_pnl
+                trades[n_trades] = trade_pnl
+                n_trades += 1
+                position = 0
+        
+        # Entry logic
+        if position == 0 and rsi[i] < rsi_buy:
+            position = 1
+            entry_price = current_price
+    
+    # Close final position if any
+    if position == 1:
+        trade_pnl = (close[-1] - entry_price) * (capital / entry_price)
+        capital += trade_pnl
+        trades[n_trades] = trade_pnl
+        n_trades += 1
+    
+    return capital, trades, n_trades
+
+
+# Compiled (backtest, grid search) kernels, one pair per (stop_loss, profit_target)
+_BT_KERNELS = {}
+
+
+def make_bt(stop_loss, profit_target):
+    """
+    Backtest kernels with stop_loss/profit_target baked in as constants
+    
+    The risk levels are closed over, so numba compiles them into the code as
+    literals and LLVM can fold them into the exit comparisons. Each variant
+    is compiled once per process (and cached on disk) and kept in _BT_KERNELS.
+    
+    Returns:
+        tuple: (bt, grid) - bt(close, rsi, rsi_buy, rsi_sell, initial_capital)
+               returns the same as _run_bt; grid(close, rsi, buys, sells,
+               initial_capital) returns final capital for every (buys[k], sells[k])
+               pair, spread across cores with numba's parallel prange (a plain
+               sequential loop when numba isn't installed)
+    """
+    key = (float(stop_loss), float(profit_target))
+    kernels = _BT_KERNELS.get(key)
+    if kernels is None:
+        sl, pt = key
+        
+        @njit(cache=True)
+        def bt(close, rsi, rsi_buy, rsi_sell, initial_capital):
+            return _run_bt(close, rsi, rsi_buy, rsi_sell, sl, pt, initial_capital)
+        
+        @njit(cache=True, parallel=True)
+        def grid(close, rsi, buys, sells, initial_capital):
+            results = np.empty(buys.size)
+            for k in prange(buys.size):
+                results[k] = _run_bt(close, rsi, buys[k], sells[k], sl, pt, initial_capital)[0]
+            return results
+        
+        kernels = _BT_KERNELS[key] = (bt, grid)
+    return kernels
+
 
 class WalkForwardAnalyzer:
     """
@@ -15,80 +129,34 @@ class WalkForwardAnalyzer:
         self.initial_capital = initial_capital
         self.results = []
         
-    def calculate_rsi(self, prices, period=14):
-        """Calculate RSI indicator"""
-        deltas = np.diff(prices)
-        seed = deltas[:period+1]
-        up = seed[seed >= 0].sum() / period
-        down = -seed[seed < 0].sum() / period
-        if down == 0:
-            return 100
-        rs = up / down
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
-    
     def backtest_strategy(self, df, rsi_buy=30, rsi_sell=70, 
-                         stop_loss=0.03, profit_target=0.10):
+                         stop_loss=0.03, profit_target=0.10, close_arr=None, rsi_arr=None):
         """
         Run backtest on a dataset with given parameters
+        Pass close_arr/rsi_arr (from _precompute_rsi) to reuse arrays already built for df
+        (df may then be None)
         Returns: final capital, return %, win rate, profit factor
         """
-        capital = self.initial_capital
-        position = None
-        entry_price = 0
-        trades = []
-        
-        for i in range(14, len(df)):
-            current_price = df.iloc[i]['close']
-            prices = df.iloc[i-14:i]['close'].values
-            rsi = self.calculate_rsi(prices)
-            
-            trade_pnl = 0
-            
-            # Exit logic
-            if position == 'LONG':
-                pnl_pct = (current_price - entry_price) / entry_price
-                
-                if pnl_pct <= -stop_loss:
-                    trade_pnl = (current_price - entry_price) * (capital / entry_price)
-                    capital += trade_pnl
-                    trades.append(trade_pnl)
-                    position = None
-                
-                elif pnl_pct >= profit_target:
-                    trade_pnl = (current_price - entry_price) * (capital / entry_price)
-                    capital += trade_pnl
-                    trades.append(trade_pnl)
-                    position = None
-                
-                elif rsi > rsi_sell:
-                    trade_pnl = (current_price - entry_price) * (capital / entry_price)
-                    capital += trade_pnl
-                    trades.append(trade_pnl)
-                    position = None
-            
-            # Entry logic
-            if position is None and rsi < rsi_buy:
-                position = 'LONG'
-                entry_price = current_price
-        
-        # Close final position if any
-        if position == 'LONG':
-            final_price = df.iloc[-1]['close']
-            trade_pnl = (final_price - entry_price) * (capital / entry_price)
-            capital += trade_pnl
-            trades.append(trade_pnl)
+        close = close_arr
+        if close is None:
+            close = np.ascontiguousarray(df['close'].to_numpy(), dtype=np.float64)
+        
+        # RSI for every bar up front, then the whole bar loop runs compiled
+        if rsi_arr is None:
+            rsi_arr = _precompute_rsi(close)
+        bt, _ = make_bt(stop_loss, profit_target)
+        capital, trades, n_trades = bt(close, rsi_arr, rsi_buy, rsi_sell, float(self.initial_capital))
+        trades = trades[:n_trades]
         
         # Calculate metrics
         total_return_pct = ((capital - self.initial_capital) / self.initial_capital) * 100
         
-        if len(trades) > 0:
-            wins = [t for t in trades if t > 0]
-            losses = [t for t in trades if t < 0]
-            win_rate = (len(wins) / len(trades)) * 100
+        if n_trades > 0:
+            win_mask = trades > 0
+            win_rate = (win_mask.sum() / n_trades) * 100
             
-            total_wins = sum(wins) if wins else 0
-            total_losses = abs(sum(losses)) if losses else 0
+            total_wins = trades[win_mask].sum()
+            total_losses = abs(trades[trades < 0].sum())
             profit_factor = total_wins / total_losses if total_losses > 0 else 0
         else:
             win_rate = 0
@@ -97,34 +165,46 @@ class WalkForwardAnalyzer:
         return {
             'final_capital': capital,
             'return_pct': total_return_pct,
-            'total_trades': len(trades),
+            'total_trades': n_trades,
             'win_rate': win_rate,
             'profit_factor': profit_factor
         }
     
-    def optimize_parameters(self, df, rsi_range, verbose=False):
+    def optimize_parameters(self, df, rsi_range, verbose=False, stop_loss=0.03, profit_target=0.10,
+                            close_arr=None):
         """
         Find best RSI parameters for a training dataset
         Tests multiple RSI combinations
+        Pass close_arr to optimize on a close-price array directly (df may then be None)
         """
-        best_return = -999999
-        best_params = None
-        best_result = None
-        
         if verbose:
             print(f"  🔍 Testing {len(rsi_range)} RSI configurations...")
         
-        for rsi_buy in rsi_range:
-            for rsi_sell in rsi_range:
-                if rsi_buy >= rsi_sell:
-                    continue
-                    
-                result = self.backtest_strategy(df, rsi_buy=rsi_buy, rsi_sell=rsi_sell)
-                
-                if result['return_pct'] > best_return:
-                    best_return = result['return_pct']
-                    best_params = (rsi_buy, rsi_sell)
-                    best_result = result
+        # Valid (buy < sell) pairs as two flat arrays, in the same buy-major
+        # order as a nested loop so ties still resolve to the first pair
+        b, s = np.meshgrid(rsi_range, rsi_range, indexing='ij')
+        mask = b < s
+        buys = b[mask].astype(np.int64)
+        sells = s[mask].astype(np.int64)
+        if buys.size == 0:
+            return None, None
+        
+        # RSI depends only on prices, so it is built once per window and shared
+        # by the whole grid sweep and the final best-pair run
+        close = close_arr
+        if close is None:
+            close = np.ascontiguousarray(df['close'].to_numpy(), dtype=np.float64)
+        rsi = _precompute_rsi(close)
+        _, grid = make_bt(stop_loss, profit_target)
+        final_capitals = grid(close, rsi, buys, sells, float(self.initial_capital))
+        
+        # argmax keeps the first best pair, same as the old strict '>' scan
+        best = int(final_capitals.argmax())
+        best_params = (int(buys[best]), int(sells[best]))
+        best_result = self.backtest_strategy(df, rsi_buy=best_params[0], rsi_sell=best_params[1],
+                                             stop_loss=stop_loss, profit_target=profit_target,
+                                             close_arr=close, rsi_arr=rsi)
+        best_return = best_result['return_pct']
         
         if verbose and best_params:
             print(f"  ✅ Best: RSI {best_params[0]}/{best_params[1]} → {best_return:+.2f}%")
@@ -132,7 +212,7 @@ class WalkForwardAnalyzer:
         return best_params, best_result
     
     def run_walk_forward(self, df, train_size=0.7, test_size=0.3, 
-                        n_windows=5, rsi_range=[25, 30, 35, 40, 70, 75, 80]):
+                        n_windows=5, rsi_range=[25, 30, 35, 40, 70, 75, 80], max_workers=None):
         """
         Walk-Forward Analysis Main Function
         
@@ -143,6 +223,8 @@ class WalkForwardAnalyzer:
         test_size : float, portion of data for testing (0.3 = 30%)
         n_windows : int, number of walk-forward windows
         rsi_range : list, RSI values to test
+        max_workers : int, processes to spread the windows over
+                      (default: one per window, capped at the CPU count; 1 = no pool)
         """
         
         print("\n" + "="*70)
@@ -154,12 +236,16 @@ class WalkForwardAnalyzer:
         print(f"📈 Train/Test Split: {int(train_size*100)}% / {int(test_size*100)}%")
         print("="*70 + "\n")
         
+        # Close prices extracted once - every train/test window is a view into it
+        close_all = np.ascontiguousarray(df['close'].to_numpy(), dtype=np.float64)
+        
         # Calculate window size
         total_points = len(df)
         window_size = total_points // n_windows
         
-        results = []
-        
+        # Windows are independent, so gather them first and evaluate them in
+        # parallel; each worker gets plain close-price arrays, not DataFrames
+        jobs = []
         for window in range(n_windows):
             start_idx = window * window_size
             
@@ -173,46 +259,26 @@ class WalkForwardAnalyzer:
             split_point = int(window_size * train_size)
             train_end = start_idx + split_point
             
-            train_df = df.iloc[start_idx:train_end].reset_index(drop=True)
-            test_df = df.iloc[train_end:end_idx].reset_index(drop=True)
-            
-            print(f"📊 WINDOW {window + 1}/{n_windows}")
-            print(f"   Train: {len(train_df)} bars | Test: {len(test_df)} bars")
-            
-            # Optimize on training data
-            print(f"   🎓 Training phase...")
-            best_params, train_result = self.optimize_parameters(
-                train_df, rsi_range, verbose=True
-            )
-            
-            if best_params is None:
-                print(f"   ⚠️  No profitable parameters found in training")
-                continue
-            
-            # Test on unseen data
-            print(f"   🧪 Testing on unseen data...")
-            test_result = self.backtest_strategy(
-                test_df, 
-                rsi_buy=best_params[0], 
-                rsi_sell=best_params[1]
-            )
-            
-            print(f"   📈 Test Results: {test_result['return_pct']:+.2f}% | "
-                  f"Win Rate: {test_result['win_rate']:.1f}% | "
-                  f"Trades: {test_result['total_trades']}")
-            
-            results.append({
-                'window': window + 1,
-                'train_return': train_result['return_pct'],
-                'test_return': test_result['return_pct'],
-                'rsi_buy': best_params[0],
-                'rsi_sell': best_params[1],
-                'test_trades': test_result['total_trades'],
-                'test_win_rate': test_result['win_rate'],
-                'test_profit_factor': test_result['profit_factor']
-            })
-            
-            print()
+            # Zero-copy ndarray views - the backtests only need close prices,
+            # so no per-window DataFrame is built
+            train_close = close_all[start_idx:train_end]
+            test_close = close_all[train_end:end_idx]
+            jobs.append((window, n_windows, train_close, test_close, rsi_range, self.initial_capital))
+        
+        if max_workers is None:
+            max_workers = min(len(jobs), os.cpu_count() or 1)
+        if max_workers > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as ex:
+                outcomes = list(ex.map(_process_window, jobs))
+        else:
+            outcomes = [_process_window(job) for job in jobs]
+        
+        # Window logs are printed in order once every window is done
+        results = []
+        for log, result in outcomes:
+            sys.stdout.write(log)
+            if result is not None:
+                results.append(result)
         
         return pd.DataFrame(results)
     
@@ -224,33 +290,35 @@ class WalkForwardAnalyzer:
         print("📊 WALK-FORWARD ANALYSIS SUMMARY")
         print("="*70)
         
-        # Overall statistics
-        avg_test_return = results_df['test_return'].mean()
-        avg_train_return = results_df['train_return'].mean()
-        std_test_return = results_df['test_return'].std()
+        # Overall statistics, straight from the return arrays
+        test_returns = results_df['test_return'].to_numpy(dtype=np.float64)
+        n_windows = test_returns.size
+        avg_test_return = test_returns.mean()
+        avg_train_return = results_df['train_return'].to_numpy(dtype=np.float64).mean()
+        std_test_return = test_returns.std(ddof=1)  # Sample std, as pandas reports it
         
-        wins = (results_df['test_return'] > 0).sum()
-        losses = (results_df['test_return'] <= 0).sum()
-        win_rate = (wins / len(results_df)) * 100
+        wins = int((test_returns > 0).sum())
+        losses = n_windows - wins
+        win_rate = (wins / n_windows) * 100
         
         print(f"\n🎯 PERFORMANCE METRICS:")
         print(f"   Training Avg Return:    {avg_train_return:+.2f}%")
         print(f"   Testing Avg Return:     {avg_test_return:+.2f}%")
         print(f"   Testing Std Dev:        {std_test_return:.2f}%")
-        print(f"   Profitable Windows:     {wins}/{len(results_df)} ({win_rate:.1f}%)")
+        print(f"   Profitable Windows:     {wins}/{n_windows} ({win_rate:.1f}%)")
         
         print(f"\n📈 RETURN RANGE:")
-        print(f"   Best Window:            {results_df['test_return'].max():+.2f}%")
-        print(f"   Worst Window:           {results_df['test_return'].min():+.2f}%")
+        print(f"   Best Window:            {test_returns.max():+.2f}%")
+        print(f"   Worst Window:           {test_returns.min():+.2f}%")
         
         print(f"\n🎲 OPTIMAL PARAMETERS (Most Common):")
-        most_common_buy = results_df['rsi_buy'].mode()[0]
-        most_common_sell = results_df['rsi_sell'].mode()[0]
+        most_common_buy = _mode_int(results_df['rsi_buy'])
+        most_common_sell = _mode_int(results_df['rsi_sell'])
         print(f"   RSI Buy:                {most_common_buy}")
         print(f"   RSI Sell:               {most_common_sell}")
         
         print(f"\n⚖️  CONSISTENCY CHECK:")
-        consistency = (results_df['test_return'] > 0).sum() / len(results_df)
+        consistency = wins / n_windows
         if consistency >= 0.7:
             grade = "EXCELLENT ✅"
         elif consistency >= 0.5:
@@ -334,3 +402,64 @@ class WalkForwardAnalyzer:
         plt.savefig(save_path, dpi=300, bbox_inches='tight')
         print(f"\n✅ Walk-forward visualization saved: {save_path}")
         plt.close()
+
+
+def _process_window(args):
+    """
+    Optimize on one window's training slice, then test the winner on its unseen slice
+    
+    Module-level so ProcessPoolExecutor can pickle it. Progress messages are
+    captured instead of printed, so parallel windows don't interleave.
+    
+    Args:
+        args: (window, n_windows, train_close, test_close, rsi_range, initial_capital)
+    
+    Returns:
+        tuple: (log, result) - the window's printed output and its result
+               dict (None when training found no parameters)
+    """
+    window, n_windows, train_close, test_close, rsi_range, initial_capital = args
+    wf = WalkForwardAnalyzer(initial_capital=initial_capital)
+    result = None
+    
+    buf = io.StringIO()
+    with redirect_stdout(buf):
+        print(f"📊 WINDOW {window + 1}/{n_windows}")
+        print(f"   Train: {len(train_close)} bars | Test: {len(test_close)} bars")
+        
+        # Optimize on training data
+        print(f"   🎓 Training phase...")
+        best_params, train_result = wf.optimize_parameters(
+            None, rsi_range, verbose=True, close_arr=train_close
+        )
+        
+        if best_params is None:
+            print(f"   ⚠️  No profitable parameters found in training")
+        else:
+            # Test on unseen data
+            print(f"   🧪 Testing on unseen data...")
+            test_result = wf.backtest_strategy(
+                None, 
+                rsi_buy=best_params[0], 
+                rsi_sell=best_params[1],
+                close_arr=test_close
+            )
+            
+            print(f"   📈 Test Results: {test_result['return_pct']:+.2f}% | "
+                  f"Win Rate: {test_result['win_rate']:.1f}% | "
+                  f"Trades: {test_result['total_trades']}")
+            
+            result = {
+                'window': window + 1,
+                'train_return': train_result['return_pct'],
+                'test_return': test_result['return_pct'],
+                'rsi_buy': best_params[0],
+                'rsi_sell': best_params[1],
+                'test_trades': test_result['total_trades'],
+                'test_win_rate': test_result['win_rate'],
+                'test_profit_factor': test_result['profit_factor']
+            }
+            
+            print()
+    
+    return buf.getvalue(), result